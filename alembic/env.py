@@ -10,7 +10,10 @@ sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from app.config import settings
 from app.database import Base
-from app.models import User, FoodItem, FoodLog, WeightLog
+from app.models import (
+    User, FoodItem, FoodLog, WeightLog, DailyActivity, OCRCacheEntry, FoodSearchEnrichment, Conversation,
+    ConversationMessage
+)
 
 # this is the Alembic Config object, which provides
 # access to the values within the .ini file in use.
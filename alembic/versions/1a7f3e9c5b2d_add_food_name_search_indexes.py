@@ -0,0 +1,81 @@
+"""Add full-text search indexes on food names
+
+pg_trgm trigram and to_tsvector GIN indexes on PostgreSQL; on SQLite an
+FTS5 table kept in sync by triggers, filled from the existing items.
+
+Revision ID: 1a7f3e9c5b2d
+Revises: e6b4a9d3c1f2
+Create Date: 2026-10-17 08:40:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '1a7f3e9c5b2d'
+down_revision = 'e6b4a9d3c1f2'
+branch_labels = None
+depends_on = None
+
+# Copied from app.models.food so later model changes don't alter this revision
+SQLITE_FTS_DDL = [
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS food_items_fts USING fts5(
+        name, content='food_items', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2', prefix='2 3'
+    )
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS food_items_fts_ai AFTER INSERT ON food_items BEGIN
+        INSERT INTO food_items_fts(rowid, name) VALUES (new.id, new.name);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS food_items_fts_ad AFTER DELETE ON food_items BEGIN
+        INSERT INTO food_items_fts(food_items_fts, rowid, name) VALUES ('delete', old.id, old.name);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS food_items_fts_au AFTER UPDATE OF name ON food_items BEGIN
+        INSERT INTO food_items_fts(food_items_fts, rowid, name) VALUES ('delete', old.id, old.name);
+        INSERT INTO food_items_fts(rowid, name) VALUES (new.id, new.name);
+    END
+    """,
+]
+
+
+def upgrade() -> None:
+    dialect = op.get_bind().dialect.name
+
+    if dialect == "postgresql":
+        op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+        op.create_index(
+            "ix_food_items_name_trgm",
+            "food_items",
+            ["name"],
+            postgresql_using="gin",
+            postgresql_ops={"name": "gin_trgm_ops"}
+        )
+        op.create_index(
+            "ix_food_items_name_tsv",
+            "food_items",
+            [sa.text("to_tsvector('simple', name)")],
+            postgresql_using="gin"
+        )
+    elif dialect == "sqlite":
+        for statement in SQLITE_FTS_DDL:
+            op.execute(statement)
+        op.execute("INSERT INTO food_items_fts(food_items_fts) VALUES ('rebuild')")
+
+
+def downgrade() -> None:
+    dialect = op.get_bind().dialect.name
+
+    if dialect == "postgresql":
+        op.drop_index("ix_food_items_name_tsv", table_name="food_items")
+        op.drop_index("ix_food_items_name_trgm", table_name="food_items")
+    elif dialect == "sqlite":
+        for trigger in ("food_items_fts_au", "food_items_fts_ad", "food_items_fts_ai"):
+            op.execute(f"DROP TRIGGER IF EXISTS {trigger}")
+        op.execute("DROP TABLE IF EXISTS food_items_fts")
@@ -0,0 +1,69 @@
+"""Add the daily_activity rollup table
+
+Backfilled from the existing food and weight logs, the same way
+`python -m app.cli rebuild-activity` does.
+
+Revision ID: 3f9a1c6d2e84
+Revises: 5b2e8d17a3f0
+Create Date: 2026-10-17 08:10:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3f9a1c6d2e84'
+down_revision = '5b2e8d17a3f0'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "daily_activity",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("user_id", sa.Integer(), nullable=False),
+        sa.Column("date", sa.Date(), nullable=False),
+        sa.Column("calories_total", sa.Float(), nullable=False),
+        sa.Column("protein_total", sa.Float(), nullable=False),
+        sa.Column("carbs_total", sa.Float(), nullable=False),
+        sa.Column("fat_total", sa.Float(), nullable=False),
+        sa.Column("food_log_count", sa.Integer(), nullable=False),
+        sa.Column("has_weight", sa.Boolean(), nullable=False),
+        sa.ForeignKeyConstraint(["user_id"], ["users.id"]),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("user_id", "date", name="uq_daily_activity_user_date"),
+    )
+    op.create_index("ix_daily_activity_id", "daily_activity", ["id"])
+    op.create_index("ix_daily_activity_user_id", "daily_activity", ["user_id"])
+
+    op.execute(
+        """
+        INSERT INTO daily_activity (
+            user_id, date, calories_total, protein_total, carbs_total, fat_total,
+            food_log_count, has_weight
+        )
+        SELECT
+            user_id, date, SUM(calories), SUM(protein), SUM(carbs), SUM(fat),
+            SUM(food_log_count), MAX(has_weight) = 1
+        FROM (
+            SELECT
+                food_logs.user_id, food_logs.date, food_logs.calories,
+                COALESCE(food_items.protein, 0.0) * food_logs.weight_grams / 100 AS protein,
+                COALESCE(food_items.carbs, 0.0) * food_logs.weight_grams / 100 AS carbs,
+                COALESCE(food_items.fat, 0.0) * food_logs.weight_grams / 100 AS fat,
+                1 AS food_log_count, 0 AS has_weight
+            FROM food_logs
+            JOIN food_items ON food_items.id = food_logs.food_id
+            UNION ALL
+            SELECT user_id, date, 0.0, 0.0, 0.0, 0.0, 0, 1
+            FROM weight_logs
+        ) AS logs
+        GROUP BY user_id, date
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("daily_activity")
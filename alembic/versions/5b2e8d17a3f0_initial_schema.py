@@ -0,0 +1,88 @@
+"""Initial schema
+
+The users, food_items, food_logs and weight_logs tables as the first
+release created them on startup with create_all.
+
+Databases created that way already have these tables: stamp them with
+this revision instead of running it.
+
+Revision ID: 5b2e8d17a3f0
+Revises:
+Create Date: 2026-10-17 08:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '5b2e8d17a3f0'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "users",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("email", sa.String(), nullable=False),
+        sa.Column("password_hash", sa.String(), nullable=False),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index("ix_users_id", "users", ["id"])
+    op.create_index("ix_users_email", "users", ["email"], unique=True)
+
+    op.create_table(
+        "food_items",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("name", sa.String(), nullable=False),
+        sa.Column("calories_per_100g", sa.Float(), nullable=False),
+        sa.Column("protein", sa.Float(), nullable=True),
+        sa.Column("carbs", sa.Float(), nullable=True),
+        sa.Column("fat", sa.Float(), nullable=True),
+        sa.Column("barcode", sa.String(), nullable=True),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index("ix_food_items_id", "food_items", ["id"])
+    op.create_index("ix_food_items_name", "food_items", ["name"])
+    op.create_index("ix_food_items_barcode", "food_items", ["barcode"], unique=True)
+
+    op.create_table(
+        "food_logs",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("user_id", sa.Integer(), nullable=False),
+        sa.Column("food_id", sa.Integer(), nullable=False),
+        sa.Column("weight_grams", sa.Float(), nullable=False),
+        sa.Column("calories", sa.Float(), nullable=False),
+        sa.Column("date", sa.Date(), server_default=sa.func.current_date(), nullable=False),
+        sa.Column("weight_method", sa.String(), nullable=False),
+        sa.ForeignKeyConstraint(["food_id"], ["food_items.id"]),
+        sa.ForeignKeyConstraint(["user_id"], ["users.id"]),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index("ix_food_logs_id", "food_logs", ["id"])
+    op.create_index("ix_food_logs_user_id", "food_logs", ["user_id"])
+    op.create_index("ix_food_logs_date", "food_logs", ["date"])
+
+    op.create_table(
+        "weight_logs",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("user_id", sa.Integer(), nullable=False),
+        sa.Column("weight", sa.Float(), nullable=False),
+        sa.Column("date", sa.Date(), server_default=sa.func.current_date(), nullable=False),
+        sa.Column("method", sa.String(), nullable=False),
+        sa.ForeignKeyConstraint(["user_id"], ["users.id"]),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index("ix_weight_logs_id", "weight_logs", ["id"])
+    op.create_index("ix_weight_logs_user_id", "weight_logs", ["user_id"])
+    op.create_index("ix_weight_logs_date", "weight_logs", ["date"])
+
+
+def downgrade() -> None:
+    op.drop_table("weight_logs")
+    op.drop_table("food_logs")
+    op.drop_table("food_items")
+    op.drop_table("users")
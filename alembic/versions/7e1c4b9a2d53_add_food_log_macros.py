@@ -0,0 +1,65 @@
+"""Store protein, carbs and fat on each food log
+
+Like calories, a log's macros are fixed when it is logged, so updating a
+food item later doesn't change what its logs added to the daily rollup.
+Existing logs are filled from their food item's current values, and the
+rollup's macro totals are recomputed from them so later deletes subtract
+exactly what the totals contain.
+
+Revision ID: 7e1c4b9a2d53
+Revises: c41d7e9a2b68
+Create Date: 2026-10-17 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '7e1c4b9a2d53'
+down_revision = 'c41d7e9a2b68'
+branch_labels = None
+depends_on = None
+
+MACROS = ("protein", "carbs", "fat")
+
+
+def upgrade() -> None:
+    for name in MACROS:
+        op.add_column("food_logs", sa.Column(name, sa.Float(), nullable=True))
+
+    op.execute(
+        """
+        UPDATE food_logs SET
+            protein = COALESCE((SELECT protein FROM food_items WHERE food_items.id = food_logs.food_id), 0.0)
+                * weight_grams / 100,
+            carbs = COALESCE((SELECT carbs FROM food_items WHERE food_items.id = food_logs.food_id), 0.0)
+                * weight_grams / 100,
+            fat = COALESCE((SELECT fat FROM food_items WHERE food_items.id = food_logs.food_id), 0.0)
+                * weight_grams / 100
+        """
+    )
+
+    op.execute(
+        """
+        UPDATE daily_activity SET
+            protein_total = COALESCE((
+                SELECT SUM(protein) FROM food_logs
+                WHERE food_logs.user_id = daily_activity.user_id AND food_logs.date = daily_activity.date
+            ), 0.0),
+            carbs_total = COALESCE((
+                SELECT SUM(carbs) FROM food_logs
+                WHERE food_logs.user_id = daily_activity.user_id AND food_logs.date = daily_activity.date
+            ), 0.0),
+            fat_total = COALESCE((
+                SELECT SUM(fat) FROM food_logs
+                WHERE food_logs.user_id = daily_activity.user_id AND food_logs.date = daily_activity.date
+            ), 0.0)
+        """
+    )
+
+
+def downgrade() -> None:
+    with op.batch_alter_table("food_logs") as batch_op:
+        for name in MACROS:
+            batch_op.drop_column(name)
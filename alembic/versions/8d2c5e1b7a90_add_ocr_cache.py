@@ -0,0 +1,32 @@
+"""Add the ocr_cache table
+
+Revision ID: 8d2c5e1b7a90
+Revises: 3f9a1c6d2e84
+Create Date: 2026-10-17 08:20:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '8d2c5e1b7a90'
+down_revision = '3f9a1c6d2e84'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "ocr_cache",
+        sa.Column("key", sa.String(), nullable=False),
+        sa.Column("weight", sa.Float(), nullable=False),
+        sa.Column("confidence", sa.String(), nullable=False),
+        sa.Column("message", sa.String(), nullable=False),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+        sa.PrimaryKeyConstraint("key"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("ocr_cache")
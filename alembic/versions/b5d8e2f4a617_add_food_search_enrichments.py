@@ -0,0 +1,34 @@
+"""Add the food_search_enrichments table
+
+Records OpenFoodFacts searches fetched in the background, so every worker
+sees which are pending and can return the fetched items.
+
+Revision ID: b5d8e2f4a617
+Revises: 7e1c4b9a2d53
+Create Date: 2026-10-17 11:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b5d8e2f4a617'
+down_revision = '7e1c4b9a2d53'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "food_search_enrichments",
+        sa.Column("query", sa.String(), nullable=False),
+        sa.Column("food_ids", sa.Text(), nullable=True),
+        sa.Column("started_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("fetched_at", sa.DateTime(timezone=True), nullable=True),
+        sa.PrimaryKeyConstraint("query"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("food_search_enrichments")
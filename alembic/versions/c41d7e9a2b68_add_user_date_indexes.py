@@ -0,0 +1,48 @@
+"""Add composite (user_id, date) indexes to food and weight logs
+
+Replaces the single-column user_id indexes, which the composite indexes
+make redundant.
+
+Revision ID: c41d7e9a2b68
+Revises: 9c3d7b2e4f15
+Create Date: 2026-10-17 09:00:00.000000
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = 'c41d7e9a2b68'
+down_revision = '9c3d7b2e4f15'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Build without blocking writes on PostgreSQL (CONCURRENTLY can't run in a transaction)
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_food_logs_user_id_date",
+            "food_logs",
+            ["user_id", "date", "id"],
+            postgresql_include=["food_id", "weight_grams", "calories", "weight_method"],
+            postgresql_concurrently=True
+        )
+        op.create_index(
+            "ix_weight_logs_user_id_date",
+            "weight_logs",
+            ["user_id", "date", "id"],
+            postgresql_include=["weight", "method"],
+            postgresql_concurrently=True
+        )
+
+    op.drop_index("ix_food_logs_user_id", table_name="food_logs")
+    op.drop_index("ix_weight_logs_user_id", table_name="weight_logs")
+
+
+def downgrade() -> None:
+    op.create_index("ix_weight_logs_user_id", "weight_logs", ["user_id"])
+    op.create_index("ix_food_logs_user_id", "food_logs", ["user_id"])
+
+    op.drop_index("ix_weight_logs_user_id_date", table_name="weight_logs")
+    op.drop_index("ix_food_logs_user_id_date", table_name="food_logs")
@@ -0,0 +1,40 @@
+"""Add source and updated_at to food items
+
+Until now only OpenFoodFacts lookups stored items with a barcode, so
+existing barcoded items are marked as from OpenFoodFacts, with no
+updated_at so they are refreshed the next time they are looked up. Other
+items keep a NULL source (manual entries).
+
+Revision ID: e6b4a9d3c1f2
+Revises: 8d2c5e1b7a90
+Create Date: 2026-10-17 08:30:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e6b4a9d3c1f2'
+down_revision = '8d2c5e1b7a90'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # SQLite can't add a column with a non-constant default, so the table is rebuilt there
+    recreate = "always" if op.get_bind().dialect.name == "sqlite" else "auto"
+
+    with op.batch_alter_table("food_items", recreate=recreate) as batch_op:
+        batch_op.add_column(sa.Column("source", sa.String(), nullable=True))
+        batch_op.add_column(
+            sa.Column("updated_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True)
+        )
+
+    op.execute("UPDATE food_items SET source = 'openfoodfacts', updated_at = NULL WHERE barcode IS NOT NULL")
+
+
+def downgrade() -> None:
+    with op.batch_alter_table("food_items") as batch_op:
+        batch_op.drop_column("updated_at")
+        batch_op.drop_column("source")
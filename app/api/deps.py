@@ -1,31 +1,51 @@
-from typing import Generator
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from app.database import get_db
 from app.core.security import decode_access_token
+from app.core.user_cache import get_cached_user, cache_user
 from app.models.user import User
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/auth/login")
 
 
-def get_current_user(
-    db: Session = Depends(get_db),
+async def get_current_user(
+    db: AsyncSession = Depends(get_db),
     token: str = Depends(oauth2_scheme)
 ) -> User:
-    """Get the current authenticated user."""
+    """
+    Get the current authenticated user.
+
+    Users are served from a short-lived in-process cache, so most requests
+    don't query the users table. The returned user is detached and shared
+    between requests; don't modify it.
+    """
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
 
-    email = decode_access_token(token)
-    if email is None:
+    subject = decode_access_token(token)
+    if subject is None:
         raise credentials_exception
 
-    user = db.query(User).filter(User.email == email).first()
+    user = get_cached_user(subject)
+    if user is not None:
+        return user
+
+    # Tokens carry the user ID; older tokens carry the email
+    if subject.isdigit():
+        query = select(User).where(User.id == int(subject))
+    else:
+        query = select(User).where(User.email == subject)
+
+    result = await db.execute(query)
+    user = result.scalars().first()
     if user is None:
         raise credentials_exception
 
+    db.expunge(user)
+    cache_user(subject, user)
     return user
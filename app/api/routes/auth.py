@@ -1,54 +1,79 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordRequestForm
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from datetime import timedelta
+from typing import Optional
 from app.database import get_db
 from app.models.user import User
 from app.schemas.user import UserCreate, User as UserSchema, Token, UserLogin
 from app.core.security import (
-    verify_password,
-    get_password_hash,
+    verify_password_async,
+    get_password_hash_async,
+    password_needs_rehash,
     create_access_token
 )
+from app.core.user_cache import invalidate_user
 from app.api.deps import get_current_user
 from app.config import settings
 
 router = APIRouter()
 
 
+async def authenticate_user(db: AsyncSession, email: str, password: str) -> Optional[User]:
+    """
+    Check a user's credentials, upgrading the password hash if BCRYPT_ROUNDS changed.
+
+    Returns:
+        The user, or None if the email or password is wrong
+    """
+    result = await db.execute(select(User).where(User.email == email))
+    user = result.scalars().first()
+    if not user or not await verify_password_async(password, user.password_hash):
+        return None
+
+    # The plain password is only available here, so rehash now if the cost changed
+    if password_needs_rehash(user.password_hash):
+        user.password_hash = await get_password_hash_async(password)
+        await db.commit()
+        invalidate_user(user)
+
+    return user
+
+
 @router.post("/register", response_model=UserSchema, status_code=status.HTTP_201_CREATED)
-def register(user: UserCreate, db: Session = Depends(get_db)):
+async def register(user: UserCreate, db: AsyncSession = Depends(get_db)):
     """Register a new user."""
     # Check if user already exists
-    db_user = db.query(User).filter(User.email == user.email).first()
+    result = await db.execute(select(User).where(User.email == user.email))
+    db_user = result.scalars().first()
     if db_user:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Email already registered"
         )
 
-    # Create new user
-    hashed_password = get_password_hash(user.password)
+    # Create new user (bcrypt is CPU-bound, it runs in the password worker pool)
+    hashed_password = await get_password_hash_async(user.password)
     new_user = User(
         email=user.email,
         password_hash=hashed_password
     )
     db.add(new_user)
-    db.commit()
-    db.refresh(new_user)
+    await db.commit()
+    await db.refresh(new_user)
 
     return new_user
 
 
 @router.post("/login", response_model=Token)
-def login(
+async def login(
     form_data: OAuth2PasswordRequestForm = Depends(),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Login and get access token."""
-    # Find user
-    user = db.query(User).filter(User.email == form_data.username).first()
-    if not user or not verify_password(form_data.password, user.password_hash):
+    user = await authenticate_user(db, form_data.username, form_data.password)
+    if not user:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect email or password",
@@ -58,7 +83,7 @@ def login(
     # Create access token
     access_token_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
     access_token = create_access_token(
-        data={"sub": user.email},
+        data={"sub": str(user.id)},
         expires_delta=access_token_expires
     )
 
@@ -66,11 +91,10 @@ def login(
 
 
 @router.post("/login-json", response_model=Token)
-def login_json(user_login: UserLogin, db: Session = Depends(get_db)):
+async def login_json(user_login: UserLogin, db: AsyncSession = Depends(get_db)):
     """Login with JSON body (for mobile apps)."""
-    # Find user
-    user = db.query(User).filter(User.email == user_login.email).first()
-    if not user or not verify_password(user_login.password, user.password_hash):
+    user = await authenticate_user(db, user_login.email, user_login.password)
+    if not user:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect email or password",
@@ -80,7 +104,7 @@ def login_json(user_login: UserLogin, db: Session = Depends(get_db)):
     # Create access token
     access_token_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
     access_token = create_access_token(
-        data={"sub": user.email},
+        data={"sub": str(user.id)},
         expires_delta=access_token_expires
     )
 
@@ -88,6 +112,6 @@ def login_json(user_login: UserLogin, db: Session = Depends(get_db)):
 
 
 @router.get("/me", response_model=UserSchema)
-def get_me(current_user: User = Depends(get_current_user)):
+async def get_me(current_user: User = Depends(get_current_user)):
     """Get current user information."""
     return current_user
@@ -1,73 +1,169 @@
-from fastapi import APIRouter, Depends
-from sqlalchemy.orm import Session
-from sqlalchemy import func
-from datetime import date
-from app.database import get_db
+import json
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Request, status
+from fastapi.responses import StreamingResponse
+from starlette.background import BackgroundTask
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Optional, Tuple
+from app.database import get_db, AsyncSessionLocal
 from app.models.user import User
-from app.models.food_log import FoodLog
-from app.models.weight_log import WeightLog
+from app.models.conversation import Conversation
 from app.schemas.chat import ChatRequest, ChatResponse
 from app.api.deps import get_current_user
-from app.services.gemini import chat_with_gemini
-from app.core.streak import calculate_streak
+from app.services.gemini import generate_chat_reply, stream_chat_with_gemini, chat_error_message
+from app.services.conversations import (
+    get_conversation,
+    create_conversation,
+    add_message,
+    load_history_window,
+    window_from_history,
+    schedule_summary,
+    summarize_older_messages
+)
+from app.core.coach import get_coach_context
 
 router = APIRouter()
 
 
+async def _open_conversation(
+    request: ChatRequest,
+    db: AsyncSession,
+    user_id: int
+) -> Tuple[Optional[Conversation], dict]:
+    """
+    Get or start the request's conversation and load its history window.
+
+    Older app versions resend their whole history without a conversation ID
+    on every turn; those requests are answered from that history without
+    storing anything (conversation is None), since storing each one would
+    copy the history again every turn.
+    """
+    if request.conversation_id is not None:
+        conversation = await get_conversation(db, user_id, request.conversation_id)
+        if not conversation:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Conversation not found"
+            )
+    elif request.history:
+        return None, window_from_history([msg.model_dump() for msg in request.history])
+    else:
+        conversation = await create_conversation(db, user_id)
+
+    window = await load_history_window(db, conversation)
+    return conversation, window
+
+
 @router.post("/", response_model=ChatResponse)
-def chat(
+async def chat(
     request: ChatRequest,
-    db: Session = Depends(get_db),
+    background_tasks: BackgroundTasks,
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     """Chat with AI nutrition coach."""
-    # Gather user context
-    user_context = {}
-
-    # Get streak
-    streak_data = calculate_streak(current_user.id, db)
-    user_context["streak"] = streak_data["streak"]
-
-    # Get recent weight
-    recent_weight = db.query(WeightLog).filter(
-        WeightLog.user_id == current_user.id
-    ).order_by(WeightLog.date.desc()).first()
-
-    if recent_weight:
-        user_context["recent_weight"] = recent_weight.weight
-
-    # Get weight trend (last 7 days)
-    weight_logs = db.query(WeightLog).filter(
-        WeightLog.user_id == current_user.id
-    ).order_by(WeightLog.date.desc()).limit(7).all()
-
-    if len(weight_logs) >= 2:
-        avg_recent = sum([log.weight for log in weight_logs[:3]]) / min(3, len(weight_logs))
-        avg_older = sum([log.weight for log in weight_logs[-3:]]) / min(3, len(weight_logs))
-        diff = avg_recent - avg_older
-
-        if diff < -0.5:
-            user_context["weight_trend"] = "decreasing (good job!)"
-        elif diff > 0.5:
-            user_context["weight_trend"] = "increasing"
-        else:
-            user_context["weight_trend"] = "stable"
-
-    # Get today's calories
-    today_logs = db.query(FoodLog).filter(
-        FoodLog.user_id == current_user.id,
-        FoodLog.date == date.today()
-    ).all()
-
-    if today_logs:
-        total_calories = sum([log.calories for log in today_logs])
-        user_context["calories_today"] = round(total_calories, 2)
+    conversation, window = await _open_conversation(request, db, current_user.id)
+    conversation_id = conversation.id if conversation else None
+
+    # Cached per user and rebuilt only after their logs change
+    user_context = await get_coach_context(current_user.id, db)
+
+    # Don't hold a transaction open while waiting for Gemini
+    await db.commit()
 
     # Get response from Gemini
-    response_text = chat_with_gemini(
-        message=request.message,
-        history=request.history,
-        user_context=user_context
-    )
+    try:
+        response_text = await generate_chat_reply(
+            message=request.message,
+            history=window["history"],
+            user_context=user_context,
+            summary=window["summary"]
+        )
+    except Exception as e:
+        return ChatResponse(response=chat_error_message(e), conversation_id=conversation_id)
+
+    if conversation is None:
+        return ChatResponse(response=response_text)
+
+    add_message(db, conversation, "user", request.message)
+    add_message(db, conversation, "assistant", response_text)
+    await db.commit()
+
+    if window["needs_summary"] and schedule_summary(conversation_id):
+        background_tasks.add_task(summarize_older_messages, conversation_id, window["window_start_id"])
+
+    return ChatResponse(response=response_text, conversation_id=conversation_id)
+
 
-    return ChatResponse(response=response_text)
+def _sse_event(data: dict, event: str = None) -> str:
+    """Format a Server-Sent Event with a JSON payload."""
+    prefix = f"event: {event}\n" if event else ""
+    return f"{prefix}data: {json.dumps(data)}\n\n"
+
+
+async def _save_turn(conversation_id: int, message: str, response_text: str) -> None:
+    """Store a streamed exchange (the request's session is closed by then)."""
+    async with AsyncSessionLocal() as db:
+        conversation = await db.get(Conversation, conversation_id)
+        add_message(db, conversation, "user", message)
+        add_message(db, conversation, "assistant", response_text)
+        await db.commit()
+
+
+@router.post("/stream")
+async def chat_stream(
+    request: ChatRequest,
+    http_request: Request,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Chat with AI nutrition coach, streaming the reply as Server-Sent Events.
+
+    Sends {"text": ...} events as chunks arrive, then a "done" event with the
+    conversation_id (or an "error" event). Generation stops when the client
+    disconnects; unfinished replies are not stored.
+    """
+    conversation, window = await _open_conversation(request, db, current_user.id)
+    user_context = await get_coach_context(current_user.id, db)
+    await db.commit()
+    conversation_id = conversation.id if conversation else None
+
+    async def events():
+        chunks = stream_chat_with_gemini(
+            message=request.message,
+            history=window["history"],
+            user_context=user_context,
+            summary=window["summary"]
+        )
+        parts = []
+        try:
+            # Chunks are pulled only as fast as the client reads them
+            async for text in chunks:
+                if await http_request.is_disconnected():
+                    break
+                parts.append(text)
+                yield _sse_event({"text": text})
+            else:
+                if conversation_id is not None:
+                    await _save_turn(conversation_id, request.message, "".join(parts).strip())
+                yield _sse_event({"conversation_id": conversation_id}, event="done")
+        except Exception as e:
+            yield _sse_event({"message": chat_error_message(e)}, event="error")
+        finally:
+            # Abandon the Gemini stream so a dropped connection stops the generation
+            await chunks.aclose()
+
+    background = None
+    if window["needs_summary"] and schedule_summary(conversation_id):
+        background = BackgroundTask(summarize_older_messages, conversation_id, window["window_start_id"])
+
+    headers = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    if conversation_id is not None:
+        headers["X-Conversation-Id"] = str(conversation_id)
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers=headers,
+        background=background
+    )
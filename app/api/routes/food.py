@@ -1,7 +1,11 @@
-from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File
-from sqlalchemy.orm import Session
-from typing import List
-from datetime import date as date_type
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Request, Response, status, UploadFile, File, Form
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional
+from datetime import date as date_type, timedelta
+import hashlib
+import json
+from app.config import settings
 from app.database import get_db
 from app.models.user import User
 from app.models.food import FoodItem
@@ -19,60 +23,108 @@ from app.schemas.food_log import (
     FoodLogWithDetails
 )
 from app.api.deps import get_current_user
-from app.services.openfoodfacts import search_food_by_barcode, search_food_by_name
-from app.services.gemini import extract_food_weight_from_image
+from app.services.openfoodfacts import search_food_by_name_async
+from app.services.search_enrichment import get_enrichment, get_enriched_items, schedule_enrichment, enrich_search
+from app.services.barcode_lookup import lookup_barcode, is_stale, schedule_refresh, refresh_food_item
+from app.services.gemini import extract_food_weight_from_image, parse_crop_box
+from app.core.activity import record_food_log_added, record_food_log_removed
+from app.core.food_logs import food_logs_query
+from app.core.food_search import search_food_items
+from app.core.food_store import get_or_create_food_items
 
 router = APIRouter()
 
+# Longest date range a single food log request may cover
+MAX_LOG_RANGE_DAYS = 31
+
+
+def _search_etag(results: list) -> str:
+    """Build an ETag from the search results as they will be serialized."""
+    payload = [FoodItemSchema.model_validate(food_item).model_dump() for food_item in results]
+    digest = hashlib.sha256(json.dumps(payload, sort_keys=True).encode()).hexdigest()
+    return f'"{digest[:32]}"'
+
 
 @router.post("/search", response_model=List[FoodItemSchema])
-def search_food(
+async def search_food(
     search: FoodSearch,
-    db: Session = Depends(get_db),
+    request: Request,
+    response: Response,
+    background_tasks: BackgroundTasks,
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
-    """Search for food items by name."""
+    """
+    Search for food items by name.
+
+    Answers from the local database. With few local results, OpenFoodFacts
+    is searched too: inline, or with FOOD_SEARCH_BACKGROUND_ENRICH after the
+    response, with X-Search-Pending "true"; poll with If-None-Match set to
+    the ETag to get the enriched results (304 until they change).
+    """
     # First search local database
-    local_results = db.query(FoodItem).filter(
-        FoodItem.name.ilike(f"%{search.query}%")
-    ).limit(10).all()
-
-    # If not enough local results, search OpenFoodFacts
-    if len(local_results) < 5:
-        off_results = search_food_by_name(search.query, limit=10)
+    local_results = await search_food_items(db, search.query, limit=10)
+    seen = {food_item.id for food_item in local_results}
+    pending = False
+
+    if settings.FOOD_SEARCH_BACKGROUND_ENRICH:
+        enrichment = await get_enrichment(db, search.query)
+        if enrichment is not None and enrichment.fetched_at is not None:
+            # Return everything the fetch found, as the inline lookup does
+            for food_item in await get_enriched_items(db, enrichment):
+                if food_item.id not in seen:
+                    local_results.append(food_item)
+        elif enrichment is not None:
+            pending = True
+        elif len(local_results) < 5:
+            if await schedule_enrichment(db, search.query):
+                await db.commit()
+                background_tasks.add_task(enrich_search, search.query)
+            pending = True
+    elif len(local_results) < 5:
+        # If not enough local results, search OpenFoodFacts
+        off_results = await search_food_by_name_async(search.query, limit=10)
 
         # Add OpenFoodFacts results to database
-        for item in off_results:
-            # Check if already exists
-            existing = db.query(FoodItem).filter(
-                FoodItem.barcode == item["barcode"]
-            ).first()
+        for food_item in await get_or_create_food_items(db, off_results):
+            if food_item.id not in seen:
+                local_results.append(food_item)
+
+        await db.commit()
 
-            if not existing and item["barcode"]:
-                new_food = FoodItem(**item)
-                db.add(new_food)
-                local_results.append(new_food)
+    etag = _search_etag(local_results)
+    headers = {
+        "ETag": etag,
+        "X-Search-Pending": "true" if pending else "false",
+    }
 
-        db.commit()
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
 
+    response.headers.update(headers)
     return local_results
 
 
 @router.post("/barcode", response_model=FoodItemSchema)
-def search_by_barcode(
+async def search_by_barcode(
     search: BarcodeSearch,
-    db: Session = Depends(get_db),
+    background_tasks: BackgroundTasks,
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     """Search for food item by barcode."""
     # First check local database
-    food_item = db.query(FoodItem).filter(FoodItem.barcode == search.barcode).first()
+    result = await db.execute(select(FoodItem).where(FoodItem.barcode == search.barcode))
+    food_item = result.scalars().first()
 
     if food_item:
+        # Serve the cached item now and refresh old nutrition data after the response
+        if is_stale(food_item) and schedule_refresh(food_item):
+            background_tasks.add_task(refresh_food_item, food_item.id, food_item.barcode)
         return food_item
 
-    # Search OpenFoodFacts
-    off_result = search_food_by_barcode(search.barcode)
+    # Search OpenFoodFacts (unknown barcodes are cached, concurrent lookups shared)
+    off_result = await lookup_barcode(search.barcode)
 
     if not off_result:
         raise HTTPException(
@@ -80,26 +132,24 @@ def search_by_barcode(
             detail="Product not found"
         )
 
-    # Add to database
-    new_food = FoodItem(**off_result)
-    db.add(new_food)
-    db.commit()
-    db.refresh(new_food)
+    # Add to database (a concurrent scan of the same barcode may have added it already)
+    food_items = await get_or_create_food_items(db, [off_result])
+    await db.commit()
 
-    return new_food
+    return food_items[0]
 
 
 @router.post("/manual", response_model=FoodItemSchema, status_code=status.HTTP_201_CREATED)
-def create_food_manual(
+async def create_food_manual(
     food: FoodItemCreate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     """Manually create a food item."""
     new_food = FoodItem(**food.dict())
     db.add(new_food)
-    db.commit()
-    db.refresh(new_food)
+    await db.commit()
+    await db.refresh(new_food)
 
     return new_food
 
@@ -107,6 +157,7 @@ def create_food_manual(
 @router.post("/ocr-weight", response_model=FoodWeightOCRResponse)
 async def extract_food_weight(
     file: UploadFile = File(...),
+    crop: Optional[str] = Form(None),
     current_user: User = Depends(get_current_user)
 ):
     """Extract food weight from kitchen scale image using OCR."""
@@ -117,11 +168,22 @@ async def extract_food_weight(
             detail="File must be an image"
         )
 
+    # Optional scale display region as "left,top,right,bottom" fractions
+    crop_box = None
+    if crop:
+        try:
+            crop_box = parse_crop_box(crop)
+        except ValueError as e:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=str(e)
+            )
+
     # Read image bytes
     image_bytes = await file.read()
 
     # Extract weight using Gemini Vision
-    weight, confidence, message = extract_food_weight_from_image(image_bytes)
+    weight, confidence, message = await extract_food_weight_from_image(image_bytes, crop_box)
 
     if weight is None:
         raise HTTPException(
@@ -137,14 +199,14 @@ async def extract_food_weight(
 
 
 @router.post("/log", response_model=FoodLogSchema, status_code=status.HTTP_201_CREATED)
-def log_food(
+async def log_food(
     food_log: FoodLogCreate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     """Log a food item."""
     # Get food item
-    food_item = db.query(FoodItem).filter(FoodItem.id == food_log.food_id).first()
+    food_item = await db.get(FoodItem, food_log.food_id)
 
     if not food_item:
         raise HTTPException(
@@ -152,76 +214,85 @@ def log_food(
             detail="Food item not found"
         )
 
-    # Calculate calories
-    calories = (food_item.calories_per_100g * food_log.weight_grams) / 100
+    # Calculate calories and macros for the logged amount
+    weight_ratio = food_log.weight_grams / 100
 
     # Create food log
     new_log = FoodLog(
         user_id=current_user.id,
         food_id=food_log.food_id,
         weight_grams=food_log.weight_grams,
-        calories=calories,
+        calories=food_item.calories_per_100g * weight_ratio,
+        protein=(food_item.protein or 0.0) * weight_ratio,
+        carbs=(food_item.carbs or 0.0) * weight_ratio,
+        fat=(food_item.fat or 0.0) * weight_ratio,
         date=food_log.date or date_type.today(),
         weight_method=food_log.weight_method
     )
 
     db.add(new_log)
-    db.commit()
-    db.refresh(new_log)
+    await db.flush()
+    await record_food_log_added(db, new_log)
+    await db.commit()
+    await db.refresh(new_log)
 
     return new_log
 
 
 @router.get("/logs", response_model=List[FoodLogWithDetails])
-def get_food_logs(
-    date: date_type = None,
-    db: Session = Depends(get_db),
+async def get_food_logs(
+    date: Optional[date_type] = None,
+    start: Optional[date_type] = None,
+    end: Optional[date_type] = None,
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
-    """Get food logs for a specific date (default: today)."""
-    if date is None:
-        date = date_type.today()
-
-    logs = db.query(FoodLog).filter(
-        FoodLog.user_id == current_user.id,
-        FoodLog.date == date
-    ).all()
-
-    # Enrich with food details
-    result = []
-    for log in logs:
-        food_item = db.query(FoodItem).filter(FoodItem.id == log.food_id).first()
-        if food_item:
-            # Calculate macros for actual weight
-            weight_ratio = log.weight_grams / 100
-            result.append(FoodLogWithDetails(
-                id=log.id,
-                user_id=log.user_id,
-                food_id=log.food_id,
-                weight_grams=log.weight_grams,
-                calories=log.calories,
-                date=log.date,
-                weight_method=log.weight_method,
-                food_name=food_item.name,
-                protein=food_item.protein * weight_ratio,
-                carbs=food_item.carbs * weight_ratio,
-                fat=food_item.fat * weight_ratio
-            ))
-
-    return result
+    """
+    Get food logs for a specific date (default: today) or a start/end date range.
+
+    With only start, the range runs to today (capped at MAX_LOG_RANGE_DAYS);
+    with only end, it is that single day.
+    """
+    if start is None and end is None:
+        start = end = date or date_type.today()
+    elif end is None:
+        end = min(date_type.today(), start + timedelta(days=MAX_LOG_RANGE_DAYS - 1))
+        end = max(start, end)  # A future start is just that day
+    else:
+        start = start or end
+
+    if start > end:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="start must be on or before end"
+        )
+
+    if (end - start).days >= MAX_LOG_RANGE_DAYS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Date range cannot exceed {MAX_LOG_RANGE_DAYS} days"
+        )
+
+    # Fetch logs with food details in one query
+    result = await db.execute(food_logs_query(current_user.id, start, end))
+
+    return [FoodLogWithDetails(**row) for row in result.mappings()]
 
 
 @router.delete("/log/{log_id}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_food_log(
+async def delete_food_log(
     log_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     """Delete a food log."""
-    log = db.query(FoodLog).filter(
-        FoodLog.id == log_id,
-        FoodLog.user_id == current_user.id
-    ).first()
+    result = await db.execute(
+        select(FoodLog).where(
+            FoodLog.id == log_id,
+            FoodLog.user_id == current_user.id
+        )
+    )
+    log = result.scalars().first()
 
     if not log:
         raise HTTPException(
@@ -229,7 +300,9 @@ def delete_food_log(
             detail="Food log not found"
         )
 
-    db.delete(log)
-    db.commit()
+    await db.delete(log)
+    await db.flush()
+    await record_food_log_removed(db, log)
+    await db.commit()
 
     return None
@@ -1,5 +1,5 @@
 from fastapi import APIRouter, Depends
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from app.database import get_db
 from app.models.user import User
 from app.schemas.streak import StreakResponse
@@ -10,12 +10,12 @@ router = APIRouter()
 
 
 @router.get("/", response_model=StreakResponse)
-def get_streak(
-    db: Session = Depends(get_db),
+async def get_streak(
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     """Get user's current streak."""
-    streak_data = calculate_streak(current_user.id, db)
+    streak_data = await calculate_streak(current_user.id, db)
 
     return StreakResponse(
         streak=streak_data["streak"],
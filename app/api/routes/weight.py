@@ -1,6 +1,6 @@
-from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File
-from sqlalchemy.orm import Session
-from sqlalchemy import func
+from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File, Form
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List, Optional
 from datetime import date as date_type, timedelta
 from app.database import get_db
@@ -11,18 +11,28 @@ from app.schemas.weight_log import (
     WeightLogCreate,
     WeightOCRResponse,
     WeightStats,
-    WeightHistory
+    WeightHistory,
+    WeightPoint
 )
 from app.api.deps import get_current_user
-from app.services.gemini import extract_body_weight_from_image
+from app.services.gemini import extract_body_weight_from_image, parse_crop_box
+from app.core.activity import record_weight_log_added, record_weight_log_removed
+from app.core.weight_history import (
+    RESOLUTIONS, get_weight_stats, get_weight_page, get_weight_series, latest_weight_query
+)
+from app.core.trend import get_weight_trend, record_weigh_in
 
 router = APIRouter()
 
+# Weight history page sizes
+DEFAULT_HISTORY_PAGE_SIZE = 100
+MAX_HISTORY_PAGE_SIZE = 500
+
 
 @router.post("/manual", response_model=WeightLogSchema, status_code=status.HTTP_201_CREATED)
-def log_weight_manual(
+async def log_weight_manual(
     weight_log: WeightLogCreate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     """Manually log body weight."""
@@ -34,8 +44,11 @@ def log_weight_manual(
     )
 
     db.add(new_log)
-    db.commit()
-    db.refresh(new_log)
+    await db.flush()
+    await record_weight_log_added(db, new_log)
+    await db.commit()
+    await db.refresh(new_log)
+    record_weigh_in(current_user.id, new_log.id, new_log.date, new_log.weight)
 
     return new_log
 
@@ -43,6 +56,7 @@ def log_weight_manual(
 @router.post("/ocr", response_model=WeightOCRResponse)
 async def extract_body_weight(
     file: UploadFile = File(...),
+    crop: Optional[str] = Form(None),
     current_user: User = Depends(get_current_user)
 ):
     """Extract body weight from weighing scale image using OCR."""
@@ -53,11 +67,22 @@ async def extract_body_weight(
             detail="File must be an image"
         )
 
+    # Optional scale display region as "left,top,right,bottom" fractions
+    crop_box = None
+    if crop:
+        try:
+            crop_box = parse_crop_box(crop)
+        except ValueError as e:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=str(e)
+            )
+
     # Read image bytes
     image_bytes = await file.read()
 
     # Extract weight using Gemini Vision
-    weight, confidence, message = extract_body_weight_from_image(image_bytes)
+    weight, confidence, message = await extract_body_weight_from_image(image_bytes, crop_box)
 
     if weight is None:
         raise HTTPException(
@@ -73,23 +98,44 @@ async def extract_body_weight(
 
 
 @router.get("/history", response_model=WeightHistory)
-def get_weight_history(
+async def get_weight_history(
     days: Optional[int] = None,  # 7, 30, 90, or None for all
-    db: Session = Depends(get_db),
+    limit: int = DEFAULT_HISTORY_PAGE_SIZE,
+    cursor: Optional[str] = None,
+    resolution: Optional[str] = None,  # "daily" or "weekly" for a chart series
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
-    """Get weight history with statistics."""
-    query = db.query(WeightLog).filter(WeightLog.user_id == current_user.id)
+    """Get weight history statistics, a page of logs and an optional chart series."""
+    if not 1 <= limit <= MAX_HISTORY_PAGE_SIZE:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"limit must be between 1 and {MAX_HISTORY_PAGE_SIZE}"
+        )
+
+    if resolution is not None and resolution not in RESOLUTIONS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"resolution must be one of: {', '.join(RESOLUTIONS)}"
+        )
 
     # Filter by date range if specified
-    if days:
-        start_date = date_type.today() - timedelta(days=days)
-        query = query.filter(WeightLog.date >= start_date)
+    start_date = date_type.today() - timedelta(days=days) if days else None
+
+    try:
+        logs, next_cursor = await get_weight_page(db, current_user.id, start_date, cursor, limit)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
 
-    # Order by date
-    logs = query.order_by(WeightLog.date.desc()).all()
+    series = None
+    if resolution:
+        series = [WeightPoint(**point) for point in await get_weight_series(db, current_user.id, resolution, start_date)]
 
-    if not logs:
+    stats = await get_weight_stats(db, current_user.id, start_date)
+    if stats is None:
         return WeightHistory(
             logs=[],
             stats=WeightStats(
@@ -99,56 +145,39 @@ def get_weight_history(
                 current=None,
                 change_from_start=None,
                 trend="stable"
-            )
+            ),
+            series=series
         )
 
-    # Calculate statistics
-    weights = [log.weight for log in logs]
-    lowest = min(weights)
-    highest = max(weights)
-    average = sum(weights) / len(weights)
-    current = logs[0].weight  # Most recent (desc order)
-
-    # Calculate change from start
-    oldest_weight = logs[-1].weight  # Oldest (desc order)
-    change_from_start = current - oldest_weight
-
-    # Determine trend
-    if len(logs) >= 3:
-        recent_avg = sum([log.weight for log in logs[:3]]) / 3
-        older_avg = sum([log.weight for log in logs[-3:]]) / 3
-        diff = recent_avg - older_avg
-
-        if diff < -0.5:
-            trend = "decreasing"
-        elif diff > 0.5:
-            trend = "increasing"
-        else:
-            trend = "stable"
-    else:
-        trend = "stable"
-
-    stats = WeightStats(
-        lowest=round(lowest, 2),
-        highest=round(highest, 2),
-        average=round(average, 2),
-        current=round(current, 2),
-        change_from_start=round(change_from_start, 2),
-        trend=trend
+    # Shared with the chat coach; describes the latest weigh-ins whatever the range
+    trend = await get_weight_trend(current_user.id, db)
+    kg_per_week = trend.kg_per_week
+
+    return WeightHistory(
+        logs=logs,
+        stats=WeightStats(
+            lowest=round(stats["lowest"], 2),
+            highest=round(stats["highest"], 2),
+            average=round(stats["average"], 2),
+            current=round(stats["last"], 2),
+            change_from_start=round(stats["last"] - stats["first"], 2),
+            trend=trend.direction,
+            smoothed=round(trend.smoothed, 2),
+            kg_per_week=round(kg_per_week, 2) if kg_per_week is not None else None
+        ),
+        next_cursor=next_cursor,
+        series=series
     )
 
-    return WeightHistory(logs=logs, stats=stats)
-
 
 @router.get("/latest", response_model=WeightLogSchema)
-def get_latest_weight(
-    db: Session = Depends(get_db),
+async def get_latest_weight(
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     """Get the most recent weight log."""
-    log = db.query(WeightLog).filter(
-        WeightLog.user_id == current_user.id
-    ).order_by(WeightLog.date.desc()).first()
+    result = await db.execute(latest_weight_query(current_user.id))
+    log = result.scalars().first()
 
     if not log:
         raise HTTPException(
@@ -160,16 +189,19 @@ def get_latest_weight(
 
 
 @router.delete("/{log_id}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_weight_log(
+async def delete_weight_log(
     log_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     """Delete a weight log."""
-    log = db.query(WeightLog).filter(
-        WeightLog.id == log_id,
-        WeightLog.user_id == current_user.id
-    ).first()
+    result = await db.execute(
+        select(WeightLog).where(
+            WeightLog.id == log_id,
+            WeightLog.user_id == current_user.id
+        )
+    )
+    log = result.scalars().first()
 
     if not log:
         raise HTTPException(
@@ -177,7 +209,9 @@ def delete_weight_log(
             detail="Weight log not found"
         )
 
-    db.delete(log)
-    db.commit()
+    await db.delete(log)
+    await db.flush()
+    await record_weight_log_removed(db, log)
+    await db.commit()
 
     return None
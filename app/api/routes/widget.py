@@ -1,11 +1,11 @@
 from fastapi import APIRouter, Depends
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from datetime import date
 from app.database import get_db
 from app.models.user import User
-from app.models.food_log import FoodLog
 from app.schemas.widget import WidgetData
 from app.api.deps import get_current_user
+from app.core.activity import get_daily_activity
 
 router = APIRouter()
 
@@ -14,21 +14,16 @@ DEFAULT_CALORIE_GOAL = 2000
 
 
 @router.get("/", response_model=WidgetData)
-def get_widget_data(
-    db: Session = Depends(get_db),
+async def get_widget_data(
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     """Get widget data for home screen widget."""
     today = date.today()
 
-    # Get today's food logs
-    food_logs = db.query(FoodLog).filter(
-        FoodLog.user_id == current_user.id,
-        FoodLog.date == today
-    ).all()
-
-    # Calculate total calories consumed
-    calories_consumed = sum([log.calories for log in food_logs])
+    # Get today's total calories consumed from the daily rollup
+    activity = await get_daily_activity(current_user.id, today, db)
+    calories_consumed = activity.calories_total if activity else 0.0
 
     # Calculate calories remaining
     calorie_goal = DEFAULT_CALORIE_GOAL  # TODO: Make this user-configurable
@@ -0,0 +1,649 @@
+"""
+FitWit maintenance commands.
+
+Usage:
+    python -m app.cli migrate [--revision REV]
+    python -m app.cli bench-startup [--runs N]
+    python -m app.cli check-imports [--runs N] [--budget-ms MS]
+    python -m app.cli rebuild-activity [--user-id ID]
+    python -m app.cli check-streak-queries
+    python -m app.cli bench-ocr-preprocess DIR [--call-gemini]
+    python -m app.cli purge-ocr-cache
+    python -m app.cli rebuild-search-index
+    python -m app.cli bench-food-search [--seed ROWS] [--runs N]
+    python -m app.cli bench-login [--logins N]
+    python -m app.cli bench-gemini-overhead [--runs N]
+    python -m app.cli check-query-plans [--seed USERS]
+    python -m app.cli import-off PATH [--format jsonl|csv] [--delimiter CHAR] [--batch-size N] [--resume] [--limit N]
+"""
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+from sqlalchemy import select
+from app.database import AsyncSessionLocal, engine
+from app.models.food import FoodItem
+from app.core.activity import rebuild_daily_activity
+from app.core.food_search import search_food_items, rebuild_search_index
+
+# Loaded on first use (see app.services.gemini); importing the app must not pull them in
+LAZY_IMPORTS = ("google.generativeai", "PIL")
+
+
+async def migrate(args: argparse.Namespace) -> None:
+    """Upgrade the database schema (run once per deploy, before starting the app)."""
+    from app.core.migrations import run_migrations
+
+    try:
+        run_migrations(args.revision)
+    except RuntimeError as e:
+        print(f"Migration failed: {e}")
+        raise SystemExit(1)
+
+
+async def bench_startup(args: argparse.Namespace) -> None:
+    """Time app startup against the create_all schema check each worker used to run."""
+    from app.database import Base
+    from app.main import app, lifespan
+
+    async def app_startup():
+        async with lifespan(app):
+            pass
+
+    async def create_all_check():
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+
+    for label, func in (("app startup", app_startup), ("create_all check", create_all_check)):
+        timings = []
+        for _ in range(args.runs):
+            # Each run starts without pooled connections, like a fresh worker
+            await engine.dispose()
+            start = time.perf_counter()
+            await func()
+            timings.append((time.perf_counter() - start) * 1000)
+        print(f"{label:>16}: median {statistics.median(timings):.1f} ms, max {max(timings):.1f} ms")
+
+
+def _time_app_import() -> tuple:
+    """
+    Import app.main in a fresh interpreter.
+
+    Returns:
+        Tuple of (total ms, ms spent in the app's own modules, slowest
+        imports, lazy modules loaded)
+    """
+    code = (
+        "import sys, app.main; "
+        f"print(','.join(name for name in {LAZY_IMPORTS!r} if name in sys.modules))"
+    )
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        capture_output=True, text=True, check=True
+    )
+
+    # stderr lines look like "import time: self [us] | cumulative | <indent>module",
+    # with each module listed after the modules it imported
+    total_us = 0
+    app_us = 0
+    direct_imports = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        self_us, cumulative, name = line[len("import time:"):].split("|")
+        if name.strip() == "app" or name.strip().startswith("app."):
+            app_us += int(self_us)
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        if depth == 0:
+            if name.strip() == "app.main":
+                total_us = int(cumulative)
+                break
+            direct_imports = []
+        elif depth == 1:
+            direct_imports.append((int(cumulative), name.strip()))
+
+    loaded = [name for name in result.stdout.strip().split(",") if name]
+    return total_us / 1000, app_us / 1000, sorted(direct_imports, reverse=True)[:10], loaded
+
+
+async def check_imports(args: argparse.Namespace) -> None:
+    """
+    Time importing the app and fail if it loads the lazy SDKs or exceeds the budget.
+
+    The budget applies to the time spent in the app's own modules, which
+    is far more stable across machines than the total (mostly third-party
+    packages and disk caches).
+    """
+    timings = []
+    app_timings = []
+    for _ in range(args.runs):
+        elapsed_ms, app_ms, slowest, loaded = _time_app_import()
+        timings.append(elapsed_ms)
+        app_timings.append(app_ms)
+
+    median_ms = statistics.median(timings)
+    median_app_ms = statistics.median(app_timings)
+    print("Slowest imports of app.main (last run):")
+    for cumulative_us, name in slowest:
+        print(f"  {cumulative_us / 1000:8.1f} ms  {name}")
+    print(f"\nimport app.main: median {median_ms:.0f} ms over {args.runs} runs")
+    print(f"app modules: median {median_app_ms:.0f} ms (budget {args.budget_ms:.0f} ms)")
+
+    failed = False
+    if loaded:
+        print(f"FAIL: importing the app loaded {', '.join(loaded)}")
+        failed = True
+    if median_app_ms > args.budget_ms:
+        print("FAIL: the app's own modules are over the import time budget")
+        failed = True
+    if failed:
+        raise SystemExit(1)
+
+
+async def rebuild_activity(args: argparse.Namespace) -> None:
+    """Backfill or rebuild the daily activity rollup from the raw logs."""
+    async with AsyncSessionLocal() as db:
+        rows = await rebuild_daily_activity(db, user_id=args.user_id)
+
+    print(f"Rebuilt {rows} daily activity rows")
+
+
+# History lengths (consecutive active days) the streak query count is compared across
+STREAK_HISTORY_DAYS = (30, 365, 1000)
+
+
+async def check_streak_queries(args: argparse.Namespace) -> None:
+    """Seed 30/365/1000-day streaks and fail if computing them takes a different number of queries."""
+    from datetime import date, timedelta
+    from sqlalchemy import event, func as sql_func
+    from app.core.streak import MAX_STREAK_DAYS, calculate_streak
+    from app.models.user import User
+    from app.models.weight_log import WeightLog
+    from app.models.daily_activity import DailyActivity
+
+    statements = []
+
+    def count_statement(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    today = date.today()
+    results = {}
+
+    async with AsyncSessionLocal() as db:
+        # Seeded in a transaction that is rolled back, so the database is left as it was
+        first_user_id = (await db.execute(select(sql_func.coalesce(sql_func.max(User.id), 0)))).scalar() + 1
+        for offset, days in enumerate(STREAK_HISTORY_DAYS):
+            user_id = first_user_id + offset
+            history = [today - timedelta(days=day) for day in range(days)]
+            await db.execute(User.__table__.insert(), [
+                {"id": user_id, "email": f"streak-check-{user_id}@example.com", "password_hash": "-"}
+            ])
+            await db.execute(WeightLog.__table__.insert(), [
+                {"user_id": user_id, "weight": 70.0, "date": day, "method": "manual"} for day in history
+            ])
+            await db.execute(DailyActivity.__table__.insert(), [
+                {
+                    "user_id": user_id, "date": day, "calories_total": 0.0, "protein_total": 0.0,
+                    "carbs_total": 0.0, "fat_total": 0.0, "food_log_count": 0, "has_weight": True
+                }
+                for day in history
+            ])
+
+        event.listen(engine.sync_engine, "before_cursor_execute", count_statement)
+        try:
+            for offset, days in enumerate(STREAK_HISTORY_DAYS):
+                statements.clear()
+                start = time.perf_counter()
+                streak = await calculate_streak(first_user_id + offset, db)
+                elapsed_ms = (time.perf_counter() - start) * 1000
+                results[days] = (len(statements), streak["streak"], elapsed_ms)
+        finally:
+            event.remove(engine.sync_engine, "before_cursor_execute", count_statement)
+            await db.rollback()
+
+    failed = False
+    for days, (queries, streak, elapsed_ms) in results.items():
+        expected = min(days, MAX_STREAK_DAYS)
+        ok = streak == expected
+        failed = failed or not ok
+        print(f"{days:>5}-day history: {queries} queries, streak {streak} (expected {expected}), {elapsed_ms:.1f} ms")
+
+    query_counts = {queries for queries, _, _ in results.values()}
+    if len(query_counts) > 1:
+        print("FAIL: query count depends on the history length")
+        failed = True
+    if failed:
+        raise SystemExit(1)
+    print("Query count is constant")
+
+
+async def bench_ocr_preprocess(args: argparse.Namespace) -> None:
+    """Report OCR payload size and latency before/after pre-processing for a folder of images."""
+    from app.services.gemini import preprocess_image, _read_food_weight
+
+    paths = sorted(
+        path for path in Path(args.directory).iterdir()
+        if path.suffix.lower() in (".jpg", ".jpeg", ".png", ".webp")
+    )
+    if not paths:
+        print(f"No images found in {args.directory}")
+        return
+
+    # Bypass the OCR cache so every call reaches Gemini
+    read_weight = _read_food_weight.__wrapped__
+    totals = {"raw_bytes": 0, "processed_bytes": 0, "preprocess_s": 0.0, "raw_ocr_s": 0.0, "processed_ocr_s": 0.0}
+
+    for path in paths:
+        raw = path.read_bytes()
+
+        start = time.perf_counter()
+        processed = preprocess_image(raw)
+        preprocess_s = time.perf_counter() - start
+
+        line = f"{path.name}: {len(raw) / 1024:.0f} KB -> {len(processed) / 1024:.0f} KB, preprocess {preprocess_s * 1000:.0f} ms"
+
+        if args.call_gemini:
+            start = time.perf_counter()
+            await read_weight(raw)
+            raw_ocr_s = time.perf_counter() - start
+
+            start = time.perf_counter()
+            await read_weight(processed)
+            processed_ocr_s = time.perf_counter() - start
+
+            totals["raw_ocr_s"] += raw_ocr_s
+            totals["processed_ocr_s"] += processed_ocr_s
+            line += f", OCR {raw_ocr_s:.2f} s -> {processed_ocr_s:.2f} s"
+
+        totals["raw_bytes"] += len(raw)
+        totals["processed_bytes"] += len(processed)
+        totals["preprocess_s"] += preprocess_s
+        print(line)
+
+    count = len(paths)
+    print(
+        f"\n{count} images: {totals['raw_bytes'] / 1024 / count:.0f} KB -> "
+        f"{totals['processed_bytes'] / 1024 / count:.0f} KB average, "
+        f"preprocess {totals['preprocess_s'] * 1000 / count:.0f} ms average"
+    )
+    if args.call_gemini:
+        print(
+            f"OCR latency: {totals['raw_ocr_s'] / count:.2f} s -> "
+            f"{totals['processed_ocr_s'] / count:.2f} s average"
+        )
+
+
+async def purge_ocr_cache(args: argparse.Namespace) -> None:
+    """Delete expired rows from the ocr_cache table."""
+    from app.config import settings
+    from app.services.ocr_cache import DatabaseOCRCache
+
+    cache = DatabaseOCRCache(
+        ttl=settings.OCR_CACHE_TTL_SECONDS,
+        purge_interval=settings.OCR_CACHE_PURGE_INTERVAL_SECONDS
+    )
+    deleted = await cache.purge_expired()
+    print(f"Deleted {deleted} expired OCR cache rows")
+
+
+async def rebuild_food_search_index(args: argparse.Namespace) -> None:
+    """Create the food name search index if missing and re-index all items."""
+    async with AsyncSessionLocal() as db:
+        await rebuild_search_index(db)
+
+    print("Food search index rebuilt")
+
+
+# Common words for synthetic benchmark food names; the rest are random brand-like words
+BENCH_WORDS = [
+    "apple", "banana", "bread", "butter", "cheese", "chicken", "chocolate", "cookie",
+    "cream", "egg", "flour", "granola", "honey", "juice", "milk", "muesli", "nut",
+    "oat", "orange", "pasta", "peanut", "rice", "salmon", "sauce", "soup", "sugar",
+    "tomato", "tuna", "vanilla", "wheat", "whole", "yogurt", "organic", "light", "spread",
+]
+BENCH_QUERIES = [
+    "apple", "choc", "peanut butter", "whole wheat br", "yog", "organic milk", "sal", "tomato sauce",
+    "quinoa", "kombucha",  # no matches: the worst case for a substring scan
+]
+
+
+def _bench_food_name(rng: random.Random, vocabulary: list) -> str:
+    """Generate a food name mixing common words with rarer brand-like words."""
+    words = [rng.choice(BENCH_WORDS)] + rng.sample(vocabulary, rng.randint(1, 3))
+    rng.shuffle(words)
+    return " ".join(words)
+
+
+async def bench_food_search(args: argparse.Namespace) -> None:
+    """Compare food name search latency (p50/p99) of the index against ILIKE."""
+    from sqlalchemy import text
+
+    async def ilike_search(db, query):
+        result = await db.execute(select(FoodItem).where(FoodItem.name.ilike(f"%{query}%")).limit(10))
+        return result.scalars().all()
+
+    async def index_search(db, query):
+        return await search_food_items(db, query, limit=10)
+
+    async with AsyncSessionLocal() as db:
+        # Seeded in a transaction that is rolled back, so the database is left as it was
+        try:
+            if args.seed:
+                rng = random.Random(42)
+                vocabulary = [
+                    "".join(rng.choice("abcdefghijklmnopqrstuvwxyz") for _ in range(rng.randint(4, 9)))
+                    for _ in range(20000)
+                ]
+                batch_size = 10000
+                for offset in range(0, args.seed, batch_size):
+                    rows = [
+                        {
+                            "name": _bench_food_name(rng, vocabulary),
+                            "calories_per_100g": rng.uniform(10, 600),
+                            "protein": 0.0,
+                            "carbs": 0.0,
+                            "fat": 0.0,
+                            "source": "benchmark",
+                        }
+                        for _ in range(min(batch_size, args.seed - offset))
+                    ]
+                    await db.execute(FoodItem.__table__.insert(), rows)
+                await db.execute(text("ANALYZE food_items"))
+                print(f"Seeded {args.seed} rows (rolled back afterwards)")
+
+            for label, search in (("ILIKE", ilike_search), ("index", index_search)):
+                timings = []
+                for _ in range(args.runs):
+                    for query in BENCH_QUERIES:
+                        start = time.perf_counter()
+                        await search(db, query)
+                        timings.append((time.perf_counter() - start) * 1000)
+
+                timings.sort()
+                p50 = statistics.median(timings)
+                p99 = timings[min(len(timings) - 1, int(len(timings) * 0.99))]
+                print(f"{label:>6}: p50 {p50:.2f} ms, p99 {p99:.2f} ms over {len(timings)} queries")
+        finally:
+            await db.rollback()
+
+
+async def bench_login(args: argparse.Namespace) -> None:
+    """Measure password verification throughput of the bcrypt worker pool."""
+    from app.config import settings
+    from app.core.security import (
+        get_password_hash_async, verify_password_async, start_password_executor, shutdown_password_executor
+    )
+
+    start_password_executor()
+    try:
+        hashed = await get_password_hash_async("benchmark-password")
+
+        start = time.perf_counter()
+        await verify_password_async("benchmark-password", hashed)
+        single_s = time.perf_counter() - start
+
+        # Simulate a burst of concurrent logins
+        start = time.perf_counter()
+        results = await asyncio.gather(*(
+            verify_password_async("benchmark-password", hashed) for _ in range(args.logins)
+        ))
+        elapsed = time.perf_counter() - start
+    finally:
+        shutdown_password_executor()
+
+    assert all(results)
+    cores = min(max(settings.PASSWORD_HASH_WORKERS, 1), os.cpu_count() or 1)
+    print(f"bcrypt cost {settings.BCRYPT_ROUNDS}, {settings.PASSWORD_HASH_WORKERS} workers, {os.cpu_count()} CPUs")
+    print(f"Single verification: {single_s * 1000:.0f} ms")
+    print(
+        f"{args.logins} concurrent logins in {elapsed:.2f} s: "
+        f"{args.logins / elapsed:.1f} logins/sec, {args.logins / elapsed / cores:.1f} per core"
+    )
+
+
+async def bench_gemini_overhead(args: argparse.Namespace) -> None:
+    """Measure the local per-call overhead of setting up Gemini models (no API calls)."""
+    import google.generativeai as genai
+    from app.config import settings
+    from app.services.gemini import get_model, _start_chat
+
+    def per_call_models():
+        # What each request used to do: build a fresh model and chat session
+        genai.GenerativeModel(settings.GEMINI_OCR_MODEL)
+        genai.GenerativeModel(settings.GEMINI_CHAT_MODEL).start_chat(history=[])
+
+    def shared_models():
+        get_model("ocr")
+        get_model("chat").start_chat(history=[])
+
+    def chat_setup():
+        _start_chat("What should I eat?", [{"role": "user", "content": "Hi"}], {"streak": 3})
+
+    for label, func in (("per-call models", per_call_models), ("shared models", shared_models), ("chat setup", chat_setup)):
+        func()
+        start = time.perf_counter()
+        for _ in range(args.runs):
+            func()
+        elapsed = time.perf_counter() - start
+        print(f"{label:>16}: {elapsed / args.runs * 1_000_000:.1f} us per call")
+
+
+async def _seed_query_plan_data(db, users: int) -> None:
+    """Insert users with 90 days of food, weight and activity logs each."""
+    from datetime import date, timedelta
+    from sqlalchemy import func as sql_func
+    from app.models.user import User
+    from app.models.food_log import FoodLog
+    from app.models.weight_log import WeightLog
+    from app.models.daily_activity import DailyActivity
+
+    # A realistic catalogue, so the planner doesn't drive the join from a tiny food table
+    food_ids = list((await db.execute(
+        FoodItem.__table__.insert().returning(FoodItem.id),
+        [{"name": f"Query plan food {i}", "calories_per_100g": 100.0, "source": "benchmark"} for i in range(1000)]
+    )).scalars())
+
+    first_user_id = (await db.execute(select(sql_func.coalesce(sql_func.max(User.id), 0)))).scalar() + 1
+    await db.execute(User.__table__.insert(), [
+        {"id": first_user_id + i, "email": f"query-plan-{first_user_id + i}@example.com", "password_hash": "-"}
+        for i in range(users)
+    ])
+
+    today = date.today()
+    for user_id in range(first_user_id, first_user_id + users):
+        days = [today - timedelta(days=offset) for offset in range(90)]
+        await db.execute(FoodLog.__table__.insert(), [
+            {"user_id": user_id, "food_id": food_ids[(user_id * 7 + meal * 31 + day.toordinal()) % len(food_ids)],
+             "weight_grams": 100.0, "calories": 100.0, "date": day, "weight_method": "manual"}
+            for day in days for meal in range(3)
+        ])
+        await db.execute(WeightLog.__table__.insert(), [
+            {"user_id": user_id, "weight": 70.0, "date": day, "method": "manual"} for day in days
+        ])
+        await db.execute(DailyActivity.__table__.insert(), [
+            {
+                "user_id": user_id, "date": day, "calories_total": 300.0, "protein_total": 0.0,
+                "carbs_total": 0.0, "fat_total": 0.0, "food_log_count": 3, "has_weight": True
+            }
+            for day in days
+        ])
+    print(f"Seeded {users} users with 90 days of logs (rolled back afterwards)")
+
+
+async def check_query_plans(args: argparse.Namespace) -> None:
+    """EXPLAIN the hot per-user queries and fail if any reads a whole table or sorts."""
+    from datetime import date
+    from sqlalchemy import text
+    from app.core.query_plans import route_queries, explain, find_plan_problems
+
+    failures = 0
+    async with AsyncSessionLocal() as db:
+        # Seeded in a transaction that is rolled back, so the database is left as it was
+        try:
+            if args.seed:
+                await _seed_query_plan_data(db, args.seed)
+                await db.execute(text("ANALYZE"))
+
+            dialect_name = db.bind.dialect.name
+            for name, query in route_queries(user_id=1, today=date.today()).items():
+                plan = await explain(db, query)
+                problems = find_plan_problems(plan, dialect_name)
+
+                print(f"{'FAIL' if problems else 'ok':>4}  {name}")
+                for line in plan:
+                    print(f"        {line}")
+                if problems:
+                    failures += 1
+                    print(f"        -> {', '.join(problems)}")
+        finally:
+            await db.rollback()
+
+    if failures:
+        print(f"\n{failures} queries don't use an index properly")
+        raise SystemExit(1)
+    print("\nAll queries use indexes")
+
+
+async def import_off(args: argparse.Namespace) -> None:
+    """Import an OpenFoodFacts JSONL or CSV dump into the food database."""
+    from app.services.openfoodfacts_dump import import_dump
+
+    stats = await import_dump(
+        Path(args.path),
+        file_format=args.format,
+        batch_size=args.batch_size,
+        resume=args.resume,
+        delimiter=args.delimiter,
+        limit=args.limit
+    )
+
+    print(
+        f"Imported {stats['imported']:,} products from {stats['records']:,} records "
+        f"in {stats['elapsed_seconds']:.1f} s ({stats['rows_per_second']:,.0f} rows/sec)"
+    )
+
+
+async def _run(args: argparse.Namespace) -> None:
+    try:
+        await args.func(args)
+    finally:
+        await engine.dispose()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(prog="python -m app.cli", description="FitWit maintenance commands")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    migrate_parser = subparsers.add_parser(
+        "migrate",
+        help="Upgrade the database schema (run once per deploy)"
+    )
+    migrate_parser.add_argument("--revision", default="head", help="Target revision")
+    migrate_parser.set_defaults(func=migrate)
+
+    startup_bench_parser = subparsers.add_parser(
+        "bench-startup",
+        help="Measure app startup time against the old create_all schema check"
+    )
+    startup_bench_parser.add_argument("--runs", type=int, default=20, help="Startups to time")
+    startup_bench_parser.set_defaults(func=bench_startup)
+
+    imports_parser = subparsers.add_parser(
+        "check-imports",
+        help="Time importing the app and check the Gemini SDK and Pillow are loaded lazily"
+    )
+    imports_parser.add_argument("--runs", type=int, default=5, help="Fresh interpreters to time")
+    imports_parser.add_argument(
+        "--budget-ms", type=float, default=500, help="Maximum median import time of the app's own modules"
+    )
+    imports_parser.set_defaults(func=check_imports)
+
+    rebuild_parser = subparsers.add_parser(
+        "rebuild-activity",
+        help="Backfill or rebuild the daily activity rollup"
+    )
+    rebuild_parser.add_argument("--user-id", type=int, default=None, help="Only rebuild this user")
+    rebuild_parser.set_defaults(func=rebuild_activity)
+
+    streak_parser = subparsers.add_parser(
+        "check-streak-queries",
+        help="Check the streak takes the same number of queries for 30, 365 and 1000 day histories"
+    )
+    streak_parser.set_defaults(func=check_streak_queries)
+
+    bench_parser = subparsers.add_parser(
+        "bench-ocr-preprocess",
+        help="Compare OCR payload size and latency before/after image pre-processing"
+    )
+    bench_parser.add_argument("directory", help="Folder of sample scale photos")
+    bench_parser.add_argument("--call-gemini", action="store_true", help="Also time real Gemini OCR calls")
+    bench_parser.set_defaults(func=bench_ocr_preprocess)
+
+    purge_parser = subparsers.add_parser(
+        "purge-ocr-cache",
+        help="Delete OCR cache rows older than OCR_CACHE_TTL_SECONDS"
+    )
+    purge_parser.set_defaults(func=purge_ocr_cache)
+
+    index_parser = subparsers.add_parser(
+        "rebuild-search-index",
+        help="Create the food name search index if missing and re-index all items"
+    )
+    index_parser.set_defaults(func=rebuild_food_search_index)
+
+    search_bench_parser = subparsers.add_parser(
+        "bench-food-search",
+        help="Compare food search latency of the index against ILIKE"
+    )
+    search_bench_parser.add_argument(
+        "--seed", type=int, default=0, help="Insert this many synthetic food items first (rolled back afterwards)"
+    )
+    search_bench_parser.add_argument("--runs", type=int, default=20, help="Times to run each sample query")
+    search_bench_parser.set_defaults(func=bench_food_search)
+
+    login_bench_parser = subparsers.add_parser(
+        "bench-login",
+        help="Measure login (bcrypt verification) throughput"
+    )
+    login_bench_parser.add_argument("--logins", type=int, default=50, help="Concurrent logins to simulate")
+    login_bench_parser.set_defaults(func=bench_login)
+
+    gemini_bench_parser = subparsers.add_parser(
+        "bench-gemini-overhead",
+        help="Measure per-call Gemini model setup overhead"
+    )
+    gemini_bench_parser.add_argument("--runs", type=int, default=10000, help="Calls to time")
+    gemini_bench_parser.set_defaults(func=bench_gemini_overhead)
+
+    plans_parser = subparsers.add_parser(
+        "check-query-plans",
+        help="EXPLAIN the hot per-user queries and fail on full table scans or sorts"
+    )
+    plans_parser.add_argument(
+        "--seed", type=int, default=0, help="Insert this many users with 90 days of logs first (rolled back afterwards)"
+    )
+    plans_parser.set_defaults(func=check_query_plans)
+
+    import_parser = subparsers.add_parser(
+        "import-off",
+        help="Import an OpenFoodFacts JSONL or CSV dump (optionally gzipped)"
+    )
+    import_parser.add_argument("path", help="Dump file, e.g. openfoodfacts-products.jsonl.gz")
+    import_parser.add_argument("--format", choices=("jsonl", "csv"), default=None, help="Dump format (default: from file name)")
+    import_parser.add_argument("--delimiter", default="\t", help="CSV field delimiter (default: tab)")
+    import_parser.add_argument("--batch-size", type=int, default=5000, help="Products per INSERT batch")
+    import_parser.add_argument("--resume", action="store_true", help="Continue from the last checkpoint")
+    import_parser.add_argument("--limit", type=int, default=None, help="Stop after this many records")
+    import_parser.set_defaults(func=import_off)
+
+    args = parser.parse_args()
+    asyncio.run(_run(args))
+
+
+if __name__ == "__main__":
+    main()
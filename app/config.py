@@ -6,17 +6,70 @@ from pathlib import Path
 class Settings(BaseSettings):
     # Database
     DATABASE_URL: str
+    ASYNC_DATABASE_URL: Optional[str] = None  # Defaults to DATABASE_URL with an async driver
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT: int = 30  # seconds to wait for a free connection
+    DB_POOL_RECYCLE: int = 1800  # seconds before a connection is replaced
+    DB_POOL_PRE_PING: bool = True
+    DB_ECHO: bool = False  # Log every SQL statement
 
     # Security
     SECRET_KEY: str
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 10080  # 7 days
+    AUTH_USER_CACHE_TTL_SECONDS: int = 60  # How long an authenticated user is served from memory
+    AUTH_USER_CACHE_MAX_ENTRIES: int = 10000
+    AUTH_TOKEN_CACHE_MAX_ENTRIES: int = 10000  # Verified tokens kept to skip signature checks
+    BCRYPT_ROUNDS: int = 12  # Password hashes with another cost are upgraded on login
+    PASSWORD_HASH_WORKERS: int = 2  # Processes for bcrypt; 0 runs it in the request threadpool
 
     # Gemini API
-    GEMINI_API_KEY: str
+    GEMINI_API_KEY: Optional[str] = None  # Only needed by workers that call Gemini (OCR, chat)
+    GEMINI_OCR_MAX_CONCURRENCY: int = 4  # Concurrent OCR calls per worker
+    GEMINI_TIMEOUT_SECONDS: float = 30.0
+    GEMINI_OCR_MODEL: str = "gemini-1.5-flash"
+    GEMINI_CHAT_MODEL: str = "gemini-1.5-pro"
+    GEMINI_SUMMARY_MODEL: str = "gemini-1.5-flash"  # Rolling chat summaries
+    GEMINI_OCR_TEMPERATURE: Optional[float] = None  # None uses the model's default
+    GEMINI_CHAT_TEMPERATURE: Optional[float] = None
+    GEMINI_CHAT_MAX_OUTPUT_TOKENS: Optional[int] = None
+    GEMINI_SUMMARY_TEMPERATURE: Optional[float] = None
+    GEMINI_WARMUP: bool = False  # Send a tiny request to each model on startup
+    COACH_CONTEXT_TTL_SECONDS: int = 300  # Chat context is also checked against the logs on every read
+    COACH_CONTEXT_CACHE_MAX_ENTRIES: int = 10000
+    WEIGHT_TREND_TTL_SECONDS: int = 3600  # Cached trends are also checked against the weight logs on every read
+    WEIGHT_TREND_CACHE_MAX_ENTRIES: int = 10000
+    CHAT_HISTORY_TOKEN_BUDGET: int = 2000  # Recent messages sent to the model, older ones are summarized
+    CHAT_HISTORY_MAX_MESSAGES: int = 50  # Recent messages loaded per turn
+    CHAT_SUMMARY_MIN_TOKENS: int = 500  # Older messages stay in the prompt until this many would be summarized
+
+    # OCR image pre-processing
+    OCR_MAX_IMAGE_EDGE: int = 1024  # pixels, longest edge sent to Gemini
+    OCR_IMAGE_FORMAT: str = "JPEG"  # "JPEG" or "WEBP"
+    OCR_IMAGE_QUALITY: int = 85
+
+    # OCR result cache
+    OCR_CACHE_BACKEND: str = "memory"  # "memory", "database" or "none"
+    OCR_CACHE_TTL_SECONDS: int = 86400
+    OCR_CACHE_MAX_ENTRIES: int = 1024  # memory backend only
+    OCR_CACHE_PURGE_INTERVAL_SECONDS: int = 3600  # database backend: delete expired rows at most this often per worker
 
     # OpenFoodFacts
     OPENFOODFACTS_API_URL: str = "https://world.openfoodfacts.org/api/v2"
+    OPENFOODFACTS_SEARCH_URL: str = "https://world.openfoodfacts.org/cgi/search.pl"
+    OPENFOODFACTS_TIMEOUT_SECONDS: float = 10.0
+    OPENFOODFACTS_MAX_RETRIES: int = 2
+    OPENFOODFACTS_BACKOFF_SECONDS: float = 0.5
+    OPENFOODFACTS_MAX_CONNECTIONS: int = 20
+    OPENFOODFACTS_USER_AGENT: str = "FitWit/1.0"
+    BARCODE_MISS_TTL_SECONDS: int = 3600  # Remember unknown barcodes this long
+    BARCODE_MISS_CACHE_MAX_ENTRIES: int = 10000
+    FOOD_REFRESH_AFTER_DAYS: int = 30  # Refresh OpenFoodFacts nutrition data in the background
+    FOOD_SEARCH_BACKGROUND_ENRICH: bool = False  # Answer searches locally, fetch OpenFoodFacts after the response
+    FOOD_SEARCH_ENRICH_TTL_SECONDS: int = 3600  # Don't re-fetch the same search from OpenFoodFacts within this time
+    FOOD_SEARCH_ENRICH_PENDING_SECONDS: int = 60  # Retry a background fetch that hasn't finished by then
+    FOOD_SEARCH_ENRICH_PURGE_INTERVAL_SECONDS: int = 3600
 
     # App Settings
     APP_NAME: str = "FitWit"
@@ -0,0 +1,247 @@
+from datetime import date
+from typing import Optional, Dict, Tuple
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, update, delete, func, case, exists
+from sqlalchemy.sql import Select
+from app.database import call_after_commit, get_dialect_insert
+from app.models.food_log import FoodLog
+from app.models.weight_log import WeightLog
+from app.models.daily_activity import DailyActivity
+from app.core.coach import invalidate_coach_context, clear_coach_contexts
+from app.core.trend import invalidate_weight_trend
+
+
+def _macros_for(log: FoodLog) -> Dict[str, float]:
+    """
+    Get the totals a food log contributes to its day.
+
+    Uses the macros stored on the log rather than the food item's current
+    values, so removing a log subtracts exactly what adding it added even
+    if the item has been updated since.
+    """
+    return {
+        "calories_total": log.calories,
+        "protein_total": log.protein or 0.0,
+        "carbs_total": log.carbs or 0.0,
+        "fat_total": log.fat or 0.0,
+    }
+
+
+def _invalidate_after_commit(db: AsyncSession, user_id: int, weight_trend: bool = False) -> None:
+    """Drop the user's cached coach context (and weight trend) once the caller commits."""
+    call_after_commit(db, lambda: invalidate_coach_context(user_id))
+    if weight_trend:
+        call_after_commit(db, lambda: invalidate_weight_trend(user_id))
+
+
+async def _delete_if_empty(db: AsyncSession, user_id: int, day: date) -> None:
+    """Remove the rollup row once a day has no logs left."""
+    await db.execute(
+        delete(DailyActivity).where(
+            DailyActivity.user_id == user_id,
+            DailyActivity.date == day,
+            DailyActivity.food_log_count <= 0,
+            DailyActivity.has_weight.is_(False)
+        )
+    )
+
+
+async def record_food_log_added(db: AsyncSession, log: FoodLog) -> None:
+    """
+    Add a food log to the user's daily rollup.
+
+    Runs in the caller's transaction, so the rollup is committed together
+    with the log itself; cached views of the user are dropped once it commits.
+
+    Args:
+        db: Database session
+        log: Food log being added
+    """
+    totals = _macros_for(log)
+    insert = get_dialect_insert(db)
+
+    stmt = insert(DailyActivity).values(
+        user_id=log.user_id,
+        date=log.date,
+        food_log_count=1,
+        has_weight=False,
+        **totals
+    )
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[DailyActivity.user_id, DailyActivity.date],
+        set_={
+            "food_log_count": DailyActivity.food_log_count + 1,
+            **{
+                name: getattr(DailyActivity, name) + stmt.excluded[name]
+                for name in totals
+            }
+        }
+    )
+    await db.execute(stmt)
+    _invalidate_after_commit(db, log.user_id)
+
+
+async def record_food_log_removed(db: AsyncSession, log: FoodLog) -> None:
+    """
+    Remove a food log from the user's daily rollup.
+
+    Args:
+        db: Database session
+        log: Food log being deleted
+    """
+    totals = _macros_for(log)
+    last_log = DailyActivity.food_log_count <= 1
+
+    # Reset totals to zero on the last log instead of accumulating float drift
+    values = {
+        name: case((last_log, 0.0), else_=getattr(DailyActivity, name) - amount)
+        for name, amount in totals.items()
+    }
+    values["food_log_count"] = case((last_log, 0), else_=DailyActivity.food_log_count - 1)
+
+    await db.execute(
+        update(DailyActivity).where(
+            DailyActivity.user_id == log.user_id,
+            DailyActivity.date == log.date
+        ).values(**values)
+    )
+    await _delete_if_empty(db, log.user_id, log.date)
+    _invalidate_after_commit(db, log.user_id)
+
+
+async def record_weight_log_added(db: AsyncSession, log: WeightLog) -> None:
+    """
+    Mark the weight log's day as having a weigh-in.
+
+    Args:
+        db: Database session
+        log: Weight log being added
+    """
+    insert = get_dialect_insert(db)
+
+    stmt = insert(DailyActivity).values(
+        user_id=log.user_id,
+        date=log.date,
+        calories_total=0.0,
+        protein_total=0.0,
+        carbs_total=0.0,
+        fat_total=0.0,
+        food_log_count=0,
+        has_weight=True
+    )
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[DailyActivity.user_id, DailyActivity.date],
+        set_={"has_weight": True}
+    )
+    await db.execute(stmt)
+    _invalidate_after_commit(db, log.user_id)
+
+
+async def record_weight_log_removed(db: AsyncSession, log: WeightLog) -> None:
+    """
+    Update the weight log's day after the log has been deleted.
+
+    Must be called after the delete is flushed, since the day keeps its
+    weigh-in flag if other weight logs remain on it.
+
+    Args:
+        db: Database session
+        log: Weight log being deleted
+    """
+    remaining = exists().where(
+        WeightLog.user_id == log.user_id,
+        WeightLog.date == log.date
+    )
+
+    await db.execute(
+        update(DailyActivity).where(
+            DailyActivity.user_id == log.user_id,
+            DailyActivity.date == log.date
+        ).values(has_weight=remaining)
+    )
+    await _delete_if_empty(db, log.user_id, log.date)
+    _invalidate_after_commit(db, log.user_id, weight_trend=True)
+
+
+def daily_activity_query(user_id: int, day: date) -> Select:
+    """Build the query for the rollup row of a user's day."""
+    return select(DailyActivity).where(
+        DailyActivity.user_id == user_id,
+        DailyActivity.date == day
+    )
+
+
+async def get_daily_activity(user_id: int, day: date, db: AsyncSession) -> Optional[DailyActivity]:
+    """Get the rollup row for a user's day, or None if they were inactive."""
+    result = await db.execute(daily_activity_query(user_id, day))
+    return result.scalar_one_or_none()
+
+
+async def rebuild_daily_activity(db: AsyncSession, user_id: Optional[int] = None) -> int:
+    """
+    Rebuild the daily rollup from the raw food and weight logs.
+
+    Used to backfill the table and to repair it if it ever drifts.
+
+    Args:
+        db: Database session
+        user_id: Only rebuild this user's rows (default: all users)
+
+    Returns:
+        Number of rollup rows written
+    """
+    food_query = select(
+        FoodLog.user_id,
+        FoodLog.date,
+        func.sum(FoodLog.calories),
+        func.sum(func.coalesce(FoodLog.protein, 0.0)),
+        func.sum(func.coalesce(FoodLog.carbs, 0.0)),
+        func.sum(func.coalesce(FoodLog.fat, 0.0)),
+        func.count(FoodLog.id)
+    ).group_by(FoodLog.user_id, FoodLog.date)
+
+    weight_query = select(WeightLog.user_id, WeightLog.date).distinct()
+
+    delete_stmt = delete(DailyActivity)
+    if user_id is not None:
+        food_query = food_query.where(FoodLog.user_id == user_id)
+        weight_query = weight_query.where(WeightLog.user_id == user_id)
+        delete_stmt = delete_stmt.where(DailyActivity.user_id == user_id)
+
+    days: Dict[Tuple[int, date], dict] = {}
+
+    for uid, day, calories, protein, carbs, fat, count in await db.execute(food_query):
+        days[(uid, day)] = {
+            "user_id": uid,
+            "date": day,
+            "calories_total": calories or 0.0,
+            "protein_total": protein or 0.0,
+            "carbs_total": carbs or 0.0,
+            "fat_total": fat or 0.0,
+            "food_log_count": count,
+            "has_weight": False,
+        }
+
+    for uid, day in await db.execute(weight_query):
+        row = days.setdefault((uid, day), {
+            "user_id": uid,
+            "date": day,
+            "calories_total": 0.0,
+            "protein_total": 0.0,
+            "carbs_total": 0.0,
+            "fat_total": 0.0,
+            "food_log_count": 0,
+        })
+        row["has_weight"] = True
+
+    await db.execute(delete_stmt)
+    if days:
+        await db.execute(DailyActivity.__table__.insert(), list(days.values()))
+    await db.commit()
+
+    if user_id is None:
+        clear_coach_contexts()
+    else:
+        invalidate_coach_context(user_id)
+
+    return len(days)
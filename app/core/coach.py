@@ -0,0 +1,150 @@
+from datetime import date, timedelta
+from typing import Optional, Tuple
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import func, select
+from sqlalchemy.sql import Select
+from app.config import settings
+from app.core.cache import TTLCache
+from app.core.streak import MAX_STREAK_DAYS, count_streak
+from app.core.trend import WeightTrend, get_weight_trend
+from app.models.daily_activity import DailyActivity
+from app.models.food_log import FoodLog
+from app.models.weight_log import WeightLog
+
+# Bump when the context's shape or contents change so cached contexts are rebuilt
+COACH_CONTEXT_VERSION = 2
+
+# Per-user coach context, dropped whenever the user's logs change. Each worker
+# has its own, so cached contexts are also checked against the logs on read.
+_contexts = TTLCache(
+    maxsize=settings.COACH_CONTEXT_CACHE_MAX_ENTRIES,
+    ttl=settings.COACH_CONTEXT_TTL_SECONDS
+)
+
+
+def _describe_trend(trend: WeightTrend) -> str:
+    """Describe a weight trend for the coach prompt."""
+    if trend.direction == "stable":
+        return "stable"
+
+    rate = f"{trend.kg_per_week:+.1f} kg/week"
+    if trend.direction == "decreasing":
+        return f"decreasing (good job!), {rate}"
+    return f"increasing, {rate}"
+
+
+def log_version_query(user_id: int) -> Select:
+    """Build the query behind get_log_version."""
+    def count_and_max(model):
+        where = model.user_id == user_id
+        return (
+            select(func.count(model.id)).where(where).scalar_subquery(),
+            select(func.max(model.id)).where(where).scalar_subquery(),
+        )
+
+    return select(*count_and_max(FoodLog), *count_and_max(WeightLog))
+
+
+def coach_activity_query(user_id: int, today: date) -> Select:
+    """Build the query for the rollup rows of the streak window, newest first."""
+    return select(DailyActivity.date, DailyActivity.calories_total, DailyActivity.food_log_count).where(
+        DailyActivity.user_id == user_id,
+        DailyActivity.date >= today - timedelta(days=MAX_STREAK_DAYS - 1),
+        DailyActivity.date <= today
+    ).order_by(DailyActivity.date.desc())
+
+
+async def get_log_version(user_id: int, db: AsyncSession) -> Tuple[int, Optional[int], int, Optional[int]]:
+    """
+    Get the count and highest ID of a user's food logs and weight logs.
+
+    Logs are only added (with increasing IDs) or deleted, never edited, so
+    this changes whenever anything the coach context is built from does.
+    Both are read from the (user_id, date, id) indexes in one query.
+    """
+    row = (await db.execute(log_version_query(user_id))).one()
+    return tuple(row)
+
+
+async def build_coach_context(user_id: int, db: AsyncSession) -> dict:
+    """
+    Compute the chat coach's view of a user's progress.
+
+    Uses the daily activity rollup for the streak window (which also
+    holds today's calories) and the shared weight trend (see
+    app.core.trend), which is usually cached.
+
+    Args:
+        user_id: User ID
+        db: Database session
+
+    Returns:
+        dict with streak, recent_weight, weight_trend and calories_today
+        (keys are omitted when there is no data), plus version and date
+    """
+    today = date.today()
+
+    activity = (await db.execute(coach_activity_query(user_id, today))).all()
+
+    trend = await get_weight_trend(user_id, db)
+
+    streak, _ = count_streak([row.date for row in activity], today)
+    context = {
+        "version": COACH_CONTEXT_VERSION,
+        "date": today,
+        "streak": streak,
+    }
+
+    if trend.last_weight is not None:
+        context["recent_weight"] = trend.last_weight
+
+    if trend.kg_per_week is not None:
+        context["weight_trend"] = _describe_trend(trend)
+
+    if activity and activity[0].date == today and activity[0].food_log_count > 0:
+        context["calories_today"] = round(activity[0].calories_total, 2)
+
+    return context
+
+
+async def get_coach_context(user_id: int, db: AsyncSession) -> dict:
+    """
+    Get a user's coach context, from the cache when it is still current.
+
+    Cached contexts are reused until the user's logs change, the day rolls
+    over or COACH_CONTEXT_VERSION is bumped. Changes made through this
+    worker drop the context right away (see invalidate_coach_context);
+    changes made through other workers are caught by comparing the
+    context's log version with the database on every read.
+
+    Args:
+        user_id: User ID
+        db: Database session
+
+    Returns:
+        Coach context dict (see build_coach_context)
+    """
+    logs = await get_log_version(user_id, db)
+    context = _contexts.get(user_id)
+    if (
+        context is not None
+        and context["version"] == COACH_CONTEXT_VERSION
+        and context["date"] == date.today()
+        and context["logs"] == logs
+    ):
+        return context
+
+    context = await build_coach_context(user_id, db)
+    context["logs"] = logs
+    _contexts.set(user_id, context)
+    return context
+
+
+def invalidate_coach_context(user_id: int) -> None:
+    """Drop a user's cached coach context. Call whenever their logs change."""
+    _contexts.delete(user_id)
+
+
+def clear_coach_contexts() -> None:
+    """Drop all cached coach contexts."""
+    _contexts.clear()
@@ -0,0 +1,36 @@
+from datetime import date
+from sqlalchemy import select, func
+from sqlalchemy.sql import Select
+from app.models.food import FoodItem
+from app.models.food_log import FoodLog
+
+
+def food_logs_query(user_id: int, start: date, end: date) -> Select:
+    """
+    Build the query for a user's food logs with their food names, oldest first.
+
+    Args:
+        user_id: User ID
+        start: First day (inclusive)
+        end: Last day (inclusive)
+
+    Returns:
+        Select of rows shaped like FoodLogWithDetails
+    """
+    return select(
+        FoodLog.id,
+        FoodLog.user_id,
+        FoodLog.food_id,
+        FoodLog.weight_grams,
+        FoodLog.calories,
+        FoodLog.date,
+        FoodLog.weight_method,
+        FoodItem.name.label("food_name"),
+        func.coalesce(FoodLog.protein, 0.0).label("protein"),
+        func.coalesce(FoodLog.carbs, 0.0).label("carbs"),
+        func.coalesce(FoodLog.fat, 0.0).label("fat")
+    ).join(FoodItem, FoodItem.id == FoodLog.food_id).where(
+        FoodLog.user_id == user_id,
+        FoodLog.date >= start,
+        FoodLog.date <= end
+    ).order_by(FoodLog.date, FoodLog.id)
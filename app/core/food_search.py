@@ -0,0 +1,89 @@
+import re
+from typing import List
+from sqlalchemy import select, func, literal_column, text, table, column
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.models.food import FoodItem, FOOD_NAME_TSVECTOR, SQLITE_FTS_DDL
+
+# SQLite FTS5 shadow table maintained by triggers on food_items
+food_items_fts = table("food_items_fts", column("rowid"), column("name"))
+
+
+def tokenize(query: str) -> List[str]:
+    """Split a search query into lowercase word tokens."""
+    return re.findall(r"\w+", query.lower())
+
+
+async def search_food_items(db: AsyncSession, query: str, limit: int = 10) -> List[FoodItem]:
+    """
+    Search food items by name using the database's full-text index.
+
+    Every word in the query must match as a word prefix, so partial input
+    works for type-ahead. Results are ranked by relevance.
+
+    - PostgreSQL: tsvector prefix match or pg_trgm similarity (GIN indexes)
+    - SQLite: FTS5 match ranked by bm25
+    - Other databases: ILIKE substring match
+
+    Args:
+        db: Database session
+        query: Search text
+        limit: Maximum number of results
+
+    Returns:
+        List of matching food items, best match first
+    """
+    tokens = tokenize(query)
+    if not tokens:
+        return []
+
+    dialect = db.get_bind().dialect.name
+
+    if dialect == "postgresql":
+        ts_query = func.to_tsquery(
+            literal_column("'simple'"),
+            " & ".join(f"{token}:*" for token in tokens)
+        )
+        statement = select(FoodItem).where(
+            FOOD_NAME_TSVECTOR.op("@@")(ts_query) | FoodItem.name.op("%")(query)
+        ).order_by(
+            func.ts_rank(FOOD_NAME_TSVECTOR, ts_query).desc(),
+            func.similarity(FoodItem.name, query).desc()
+        )
+    elif dialect == "sqlite":
+        match = " ".join(f'"{token}"*' for token in tokens)
+        statement = select(FoodItem).join(
+            food_items_fts, food_items_fts.c.rowid == FoodItem.id
+        ).where(
+            text("food_items_fts MATCH :match").bindparams(match=match)
+        ).order_by(text("bm25(food_items_fts)"))
+    else:
+        statement = select(FoodItem).where(FoodItem.name.ilike(f"%{query}%"))
+
+    result = await db.execute(statement.limit(limit))
+    return list(result.scalars().all())
+
+
+async def rebuild_search_index(db: AsyncSession) -> None:
+    """
+    Create the search index if missing and re-index all food names.
+
+    Needed for databases whose food_items table predates the index.
+    """
+    dialect = db.get_bind().dialect.name
+
+    if dialect == "postgresql":
+        await db.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+        await db.execute(text(
+            "CREATE INDEX IF NOT EXISTS ix_food_items_name_trgm "
+            "ON food_items USING gin (name gin_trgm_ops)"
+        ))
+        await db.execute(text(
+            "CREATE INDEX IF NOT EXISTS ix_food_items_name_tsv "
+            "ON food_items USING gin (to_tsvector('simple', name))"
+        ))
+    elif dialect == "sqlite":
+        for statement in SQLITE_FTS_DDL:
+            await db.execute(text(statement))
+        await db.execute(text("INSERT INTO food_items_fts(food_items_fts) VALUES ('rebuild')"))
+
+    await db.commit()
@@ -0,0 +1,101 @@
+from datetime import datetime, timezone
+from typing import Dict, List
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.database import get_dialect_insert
+from app.models.food import FoodItem
+
+# Columns filled from OpenFoodFacts data
+FOOD_ITEM_FIELDS = ("name", "calories_per_100g", "protein", "carbs", "fat", "barcode", "source")
+
+
+def _dedupe_by_barcode(items: List[Dict]) -> List[Dict]:
+    """Keep the last item per barcode (a statement can't touch a row twice)."""
+    by_barcode = {}
+    for item in items:
+        if item.get("barcode"):
+            by_barcode[item["barcode"]] = {field: item.get(field) for field in FOOD_ITEM_FIELDS}
+    return list(by_barcode.values())
+
+
+async def _get_by_barcodes(db: AsyncSession, barcodes: List[str]) -> Dict[str, FoodItem]:
+    result = await db.execute(select(FoodItem).where(FoodItem.barcode.in_(barcodes)))
+    return {food_item.barcode: food_item for food_item in result.scalars()}
+
+
+async def get_or_create_food_items(db: AsyncSession, items: List[Dict]) -> List[FoodItem]:
+    """
+    Get the stored food items for a list of barcoded items, inserting missing ones.
+
+    Existing items are found with a single IN query and the rest are added
+    with INSERT ... ON CONFLICT DO NOTHING RETURNING, so a concurrent request
+    inserting the same barcode can't fail the statement. The caller commits.
+
+    Args:
+        db: Database session
+        items: Food item dictionaries as returned by openfoodfacts.parse_product
+
+    Returns:
+        Stored food items in the order of the input (items without a barcode are skipped)
+    """
+    barcodes = list(dict.fromkeys(item["barcode"] for item in items if item.get("barcode")))
+    if not barcodes:
+        return []
+
+    food_items = await _get_by_barcodes(db, barcodes)
+
+    rows = [row for row in _dedupe_by_barcode(items) if row["barcode"] not in food_items]
+    if rows:
+        now = datetime.now(timezone.utc)
+        for row in rows:
+            row["updated_at"] = now
+
+        insert = get_dialect_insert(db)
+        stmt = insert(FoodItem).on_conflict_do_nothing(index_elements=[FoodItem.barcode])
+        inserted = await db.scalars(stmt.returning(FoodItem), rows)
+        food_items.update((food_item.barcode, food_item) for food_item in inserted)
+
+        # Rows skipped by ON CONFLICT were inserted concurrently by another request
+        missing = [barcode for barcode in barcodes if barcode not in food_items]
+        if missing:
+            food_items.update(await _get_by_barcodes(db, missing))
+
+    return [food_items[barcode] for barcode in barcodes if barcode in food_items]
+
+
+async def upsert_food_items(db: AsyncSession, items: List[Dict]) -> int:
+    """
+    Insert food items, updating existing OpenFoodFacts items with the same barcode.
+
+    Items without a barcode are skipped. Existing items that did not come
+    from OpenFoodFacts (manual entries) are left untouched. The caller
+    commits.
+
+    Args:
+        db: Database session
+        items: Food item dictionaries as returned by openfoodfacts.parse_product
+
+    Returns:
+        Number of items sent to the database
+    """
+    rows = _dedupe_by_barcode(items)
+    if not rows:
+        return 0
+
+    now = datetime.now(timezone.utc)
+    for row in rows:
+        row["updated_at"] = now
+
+    insert = get_dialect_insert(db)
+    stmt = insert(FoodItem)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[FoodItem.barcode],
+        set_={
+            field: stmt.excluded[field]
+            for field in ("name", "calories_per_100g", "protein", "carbs", "fat", "updated_at")
+        },
+        where=FoodItem.source == "openfoodfacts"
+    )
+    await db.execute(stmt, rows)
+
+    return len(rows)
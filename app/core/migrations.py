@@ -0,0 +1,127 @@
+from pathlib import Path
+from typing import Optional, Set
+from alembic import command
+from alembic.config import Config
+from sqlalchemy import create_engine, inspect
+from app.config import settings
+
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+
+# Databases created by create_all on startup (before migrations ran on deploy)
+# have no alembic_version table. Each app version created the schema of one
+# of these revisions, in order; the schema objects a revision added tell
+# whether the app that created the database already had it.
+INITIAL_REVISION = "5b2e8d17a3f0"
+UNVERSIONED_REVISIONS = [
+    ("3f9a1c6d2e84", "table daily_activity"),
+    ("8d2c5e1b7a90", "table ocr_cache"),
+    ("e6b4a9d3c1f2", "column food_items.source"),
+    ("1a7f3e9c5b2d", "food name search index"),
+    ("9c3d7b2e4f15", "table conversations"),
+    ("c41d7e9a2b68", "index ix_food_logs_user_id_date"),
+]
+
+# Tables of the initial schema and of each later revision
+INITIAL_TABLES = {"users", "food_items", "food_logs", "weight_logs"}
+REVISION_TABLES = {
+    "3f9a1c6d2e84": {"daily_activity"},
+    "8d2c5e1b7a90": {"ocr_cache"},
+    "9c3d7b2e4f15": {"conversations", "conversation_messages"},
+}
+
+
+def get_alembic_config() -> Config:
+    """Get the Alembic config, independent of the working directory."""
+    config = Config(str(PROJECT_ROOT / "alembic.ini"))
+    config.set_main_option("script_location", str(PROJECT_ROOT / "alembic"))
+    return config
+
+
+def _has_search_index(inspector, tables: Set[str]) -> bool:
+    if inspector.bind.dialect.name == "sqlite":
+        return "food_items_fts" in tables
+    return "ix_food_items_name_trgm" in {index["name"] for index in inspector.get_indexes("food_items")}
+
+
+def find_unversioned_revision() -> Optional[str]:
+    """
+    Get the revision matching a database created by create_all.
+
+    Returns:
+        Revision ID to stamp, or None if the database is empty or already
+        under migration control
+
+    Raises:
+        RuntimeError: If the schema doesn't match any revision (e.g. it has
+            tables the app never created); stamp it by hand after checking
+    """
+    engine = create_engine(settings.DATABASE_URL)
+    try:
+        inspector = inspect(engine)
+        tables = set(inspector.get_table_names())
+        if "alembic_version" in tables or "users" not in tables:
+            return None
+
+        present = {
+            "3f9a1c6d2e84": "daily_activity" in tables,
+            "8d2c5e1b7a90": "ocr_cache" in tables,
+            "e6b4a9d3c1f2": "source" in {column["name"] for column in inspector.get_columns("food_items")},
+            "1a7f3e9c5b2d": _has_search_index(inspector, tables),
+            "9c3d7b2e4f15": "conversations" in tables,
+            "c41d7e9a2b68": "ix_food_logs_user_id_date" in {
+                index["name"] for index in inspector.get_indexes("food_logs")
+            },
+        }
+    finally:
+        engine.dispose()
+
+    revision = INITIAL_REVISION
+    expected_tables = set(INITIAL_TABLES)
+    missing = None
+    for candidate, description in UNVERSIONED_REVISIONS:
+        if not present[candidate]:
+            missing = missing or description
+            continue
+        if missing:
+            raise RuntimeError(
+                f"Unversioned database has the {description} but not the {missing}; "
+                "it doesn't match any migration revision"
+            )
+        revision = candidate
+        expected_tables |= REVISION_TABLES.get(candidate, set())
+
+    # FTS5 keeps its index in shadow tables named after the virtual table
+    unknown = {
+        table for table in tables - expected_tables
+        if not table.startswith("food_items_fts")
+    }
+    if unknown:
+        raise RuntimeError(
+            f"Unversioned database has tables the app doesn't create ({', '.join(sorted(unknown))}); "
+            f"it doesn't match revision {revision}"
+        )
+
+    return revision
+
+
+def run_migrations(revision: str = "head") -> None:
+    """
+    Upgrade the database schema. Run once per deploy, before the app starts.
+
+    Databases created by create_all are stamped with their matching
+    revision first, so only later migrations are applied to them.
+
+    Raises:
+        RuntimeError: If an unversioned database matches no revision
+
+    Args:
+        revision: Target revision
+    """
+    config = get_alembic_config()
+
+    current = find_unversioned_revision()
+    if current:
+        print(f"Database has no migration history; stamping {current}")
+        command.stamp(config, current)
+
+    command.upgrade(config, revision)
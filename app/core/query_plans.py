@@ -0,0 +1,93 @@
+import re
+from datetime import date, timedelta
+from typing import Dict, List
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.sql import Select
+from app.core.activity import daily_activity_query
+from app.core.coach import coach_activity_query, log_version_query
+from app.core.food_logs import food_logs_query
+from app.core.streak import MAX_STREAK_DAYS, active_dates_query
+from app.core.trend import weight_log_version_query, weight_trend_query
+from app.core.weight_history import latest_weight_query, weight_page_query, weight_stats_query
+from app.services.conversations import history_window_query
+
+# Plan lines that mean a query reads a whole table (or whole index), or
+# sorts rows an index should have returned in order. SQLite shows index
+# lookups as "SEARCH <table> USING ..." and full reads as "SCAN <table>"
+# ("SCAN CONSTANT ROW" is a SELECT without a table).
+PLAN_PROBLEMS = {
+    "sqlite": [
+        (re.compile(r"^SCAN (?!CONSTANT ROW)(\w+)"), "full scan of {}"),
+        (re.compile(r"^USE TEMP B-TREE FOR (.+)"), "sort for {}"),
+    ],
+    "postgresql": [
+        (re.compile(r"Seq Scan on (\w+)"), "full scan of {}"),
+        (re.compile(r"^Sort Key: (.+)"), "sort on {}"),
+    ],
+}
+
+
+def route_queries(user_id: int, today: date) -> Dict[str, Select]:
+    """
+    The per-user queries behind the hot routes, keyed on a readable name.
+
+    Built by the same functions the routes and app.core modules execute,
+    so the plans checked are those of the queries actually run.
+    """
+    return {
+        "food logs (GET /api/food/logs)": food_logs_query(user_id, today - timedelta(days=6), today),
+        # A default page of 100 plus the row that tells whether there is another
+        "weight history page (app.core.weight_history)": weight_page_query(user_id, today - timedelta(days=30), limit=101),
+        "weight history stats (app.core.weight_history)": weight_stats_query(user_id, today - timedelta(days=30)),
+        "latest weight (GET /api/weight/latest)": latest_weight_query(user_id),
+        "weight trend (app.core.trend)": weight_trend_query(user_id),
+        "weight log version (app.core.trend)": weight_log_version_query(user_id),
+        "streak window (app.core.streak)": active_dates_query(
+            user_id, today - timedelta(days=MAX_STREAK_DAYS - 1), today
+        ),
+        "widget day (app.core.activity)": daily_activity_query(user_id, today),
+        "coach activity (app.core.coach)": coach_activity_query(user_id, today),
+        "coach log version (app.core.coach)": log_version_query(user_id),
+        "chat history window (app.services.conversations)": history_window_query(conversation_id=1),
+    }
+
+
+async def explain(db: AsyncSession, query: Select) -> List[str]:
+    """
+    Get the query plan for a statement, one line per plan node.
+
+    On PostgreSQL sequential scans and sorts are disabled while planning,
+    so a "Seq Scan" or "Sort" in the plan means no index can serve the
+    query (rather than the planner preferring a scan or sort on a small
+    table). The settings are reset afterwards, so the transaction (and any
+    data seeded in it) can be reused.
+    """
+    dialect = db.bind.dialect
+    compiled = query.compile(dialect=dialect, compile_kwargs={"literal_binds": True})
+
+    if dialect.name == "sqlite":
+        result = await db.execute(text(f"EXPLAIN QUERY PLAN {compiled}"))
+        return [row[-1] for row in result]
+
+    if dialect.name == "postgresql":
+        await db.execute(text("SET LOCAL enable_seqscan = off"))
+        await db.execute(text("SET LOCAL enable_sort = off"))
+        result = await db.execute(text(f"EXPLAIN {compiled}"))
+        plan = [row[0].strip() for row in result]
+        await db.execute(text("RESET enable_seqscan"))
+        await db.execute(text("RESET enable_sort"))
+        return plan
+
+    raise NotImplementedError(f"Query plans are not supported for {dialect.name}")
+
+
+def find_plan_problems(plan: List[str], dialect_name: str) -> List[str]:
+    """Describe the full scans and sorts in a query plan (empty if none)."""
+    problems = []
+    for line in plan:
+        for pattern, description in PLAN_PROBLEMS[dialect_name]:
+            match = pattern.search(line)
+            if match:
+                problems.append(description.format(*match.groups()))
+    return problems
@@ -1,12 +1,21 @@
+import asyncio
+import multiprocessing
+import time
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime, timedelta
 from typing import Optional
+from starlette.concurrency import run_in_threadpool
 from jose import JWTError, jwt
 from passlib.context import CryptContext
 import bcrypt as _bcrypt  # Ensure bcrypt backend is available
 from app.config import settings
+from app.core.cache import TTLCache
 
-# Password hashing context
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# Password hashing context (used to spot hashes made with an outdated cost)
+pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=settings.BCRYPT_ROUNDS)
+
+# Worker processes for bcrypt, created on app startup
+_password_executor: Optional[ProcessPoolExecutor] = None
 
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
@@ -24,7 +33,63 @@ def get_password_hash(password: str) -> str:
     password_bytes = password.encode('utf-8')
     if len(password_bytes) > 72:
         password_bytes = password_bytes[:72]
-    return _bcrypt.hashpw(password_bytes, _bcrypt.gensalt()).decode('utf-8')
+    return _bcrypt.hashpw(password_bytes, _bcrypt.gensalt(rounds=settings.BCRYPT_ROUNDS)).decode('utf-8')
+
+
+def start_password_executor() -> None:
+    """
+    Create the password worker pool (called on app startup).
+
+    Workers are started from a forkserver (or spawned where that isn't
+    available) rather than forked from the app, so they don't inherit its
+    threads, open connections or event loop.
+    """
+    global _password_executor
+    if _password_executor is None and settings.PASSWORD_HASH_WORKERS > 0:
+        methods = multiprocessing.get_all_start_methods()
+        context = multiprocessing.get_context("forkserver" if "forkserver" in methods else "spawn")
+        _password_executor = ProcessPoolExecutor(max_workers=settings.PASSWORD_HASH_WORKERS, mp_context=context)
+
+
+def _get_password_executor() -> ProcessPoolExecutor:
+    # Started here only when the app's startup didn't run (e.g. from the CLI)
+    start_password_executor()
+    return _password_executor
+
+
+async def _run_password_job(func, *args):
+    """Run a bcrypt call in the password worker pool (or a thread if the pool is disabled)."""
+    if settings.PASSWORD_HASH_WORKERS <= 0:
+        return await run_in_threadpool(func, *args)
+    return await asyncio.get_running_loop().run_in_executor(_get_password_executor(), func, *args)
+
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """
+    Verify a password without blocking the event loop or the request threadpool.
+
+    Bcrypt runs in a dedicated pool of PASSWORD_HASH_WORKERS processes, so a
+    burst of logins queues there instead of starving other endpoints.
+    """
+    return await _run_password_job(verify_password, plain_password, hashed_password)
+
+
+async def get_password_hash_async(password: str) -> str:
+    """Hash a password in the password worker pool (see verify_password_async)."""
+    return await _run_password_job(get_password_hash, password)
+
+
+def password_needs_rehash(hashed_password: str) -> bool:
+    """Check whether a hash was made with a different cost than BCRYPT_ROUNDS."""
+    return pwd_context.needs_update(hashed_password)
+
+
+def shutdown_password_executor() -> None:
+    """Stop the password worker processes (called on app shutdown)."""
+    global _password_executor
+    if _password_executor is not None:
+        _password_executor.shutdown(wait=False, cancel_futures=True)
+        _password_executor = None
 
 
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
@@ -40,13 +105,38 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -
     return encoded_jwt
 
 
+# Recently verified tokens as token -> (subject, expiry timestamp), so hot
+# tokens skip the signature check
+_decoded_tokens = TTLCache(
+    maxsize=settings.AUTH_TOKEN_CACHE_MAX_ENTRIES,
+    ttl=settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60
+)
+
+
 def decode_access_token(token: str) -> Optional[str]:
-    """Decode a JWT token and return the email."""
+    """
+    Decode a JWT token and return its subject.
+
+    The subject is the user ID, or the email for tokens issued before IDs
+    were used.
+    """
+    cached = _decoded_tokens.get(token)
+    if cached is not None:
+        subject, expires_at = cached
+        if expires_at > time.time():
+            return subject
+        _decoded_tokens.delete(token)
+        return None
+
     try:
         payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
-        email: str = payload.get("sub")
-        if email is None:
+        subject = payload.get("sub")
+        if subject is None:
             return None
-        return email
     except JWTError:
         return None
+
+    expires_at = payload.get("exp")
+    if expires_at is not None:
+        _decoded_tokens.set(token, (str(subject), expires_at))
+    return str(subject)
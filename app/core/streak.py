@@ -1,10 +1,13 @@
 from datetime import date, timedelta
-from sqlalchemy.orm import Session
-from sqlalchemy import or_
-from app.models.food_log import FoodLog
-from app.models.weight_log import WeightLog
+from typing import List, Optional, Tuple
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select
+from sqlalchemy.sql import Select
+from app.models.daily_activity import DailyActivity
 import random
 
+# Maximum days to check (bounds the window the streak query scans)
+MAX_STREAK_DAYS = 365
 
 MOTIVATIONAL_MESSAGES = [
     "Go dawg!",
@@ -22,7 +25,7 @@ MOTIVATIONAL_MESSAGES = [
 ]
 
 
-def calculate_streak(user_id: int, db: Session) -> dict:
+async def calculate_streak(user_id: int, db: AsyncSession) -> dict:
     """
     Calculate user's streak based on consecutive days of logging.
 
@@ -38,38 +41,11 @@ def calculate_streak(user_id: int, db: Session) -> dict:
         dict with streak count, last_active_date, and motivation message
     """
     today = date.today()
-    streak = 0
-    last_active_date = None
 
-    # Check backwards from today
-    current_date = today
+    window_start = today - timedelta(days=MAX_STREAK_DAYS - 1)
 
-    # Maximum days to check (prevent infinite loop)
-    max_days = 365
-
-    for _ in range(max_days):
-        # Check if user has any activity on current_date
-        has_food_log = db.query(FoodLog).filter(
-            FoodLog.user_id == user_id,
-            FoodLog.date == current_date
-        ).first() is not None
-
-        has_weight_log = db.query(WeightLog).filter(
-            WeightLog.user_id == user_id,
-            WeightLog.date == current_date
-        ).first() is not None
-
-        is_active = has_food_log or has_weight_log
-
-        if is_active:
-            streak += 1
-            if last_active_date is None:
-                last_active_date = current_date
-            # Move to previous day
-            current_date -= timedelta(days=1)
-        else:
-            # Streak broken
-            break
+    active_dates = await get_active_dates(user_id, db, window_start, today)
+    streak, last_active_date = count_streak(active_dates, today)
 
     # Get motivational message
     motivation = get_motivational_message(streak)
@@ -81,6 +57,63 @@ def calculate_streak(user_id: int, db: Session) -> dict:
     }
 
 
+def count_streak(active_dates: List[date], today: date) -> Tuple[int, Optional[date]]:
+    """
+    Count consecutive active days ending today.
+
+    Args:
+        active_dates: Active dates, most recent first
+        today: Day the streak must reach
+
+    Returns:
+        Tuple of (streak, last_active_date)
+    """
+    streak = 0
+    last_active_date = None
+    current_date = today
+
+    # Walk the sorted dates backwards from today until the first gap
+    for active_date in active_dates:
+        if active_date != current_date:
+            # Streak broken
+            break
+        streak += 1
+        if last_active_date is None:
+            last_active_date = current_date
+        current_date -= timedelta(days=1)
+
+    return streak, last_active_date
+
+
+def active_dates_query(user_id: int, start: date, end: date) -> Select:
+    """Build the query behind get_active_dates."""
+    return select(DailyActivity.date).where(
+        DailyActivity.user_id == user_id,
+        DailyActivity.date >= start,
+        DailyActivity.date <= end
+    ).order_by(DailyActivity.date.desc())
+
+
+async def get_active_dates(user_id: int, db: AsyncSession, start: date, end: date) -> List[date]:
+    """
+    Get the days a user was active within a date window.
+
+    Reads the daily activity rollup, so a single indexed query covers the
+    whole window regardless of the length of the streak.
+
+    Args:
+        user_id: User ID
+        db: Database session
+        start: First day of the window (inclusive)
+        end: Last day of the window (inclusive)
+
+    Returns:
+        List of active dates, most recent first
+    """
+    result = await db.execute(active_dates_query(user_id, start, end))
+    return list(result.scalars().all())
+
+
 def get_motivational_message(streak: int) -> str:
     """
     Get a motivational message based on streak count.
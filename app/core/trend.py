@@ -0,0 +1,214 @@
+from collections import deque
+from datetime import date
+from typing import Deque, Iterable, List, Optional, Tuple
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.sql import Select
+from app.config import settings
+from app.core.cache import TTLCache
+from app.models.weight_log import WeightLog
+
+# Share of each new day's weigh-in in the smoothed weight (gaps of several
+# days count as several steps, so sparse logging isn't over-smoothed)
+EWMA_ALPHA = 0.1
+
+# The slope is fitted over the weigh-ins of the last 4 weeks
+SLOPE_WINDOW_DAYS = 28
+MIN_SLOPE_POINTS = 3
+
+# Slower changes than this (kg/week, either way) count as stable
+STABLE_KG_PER_WEEK = 0.1
+
+# Weigh-ins loaded to rebuild a trend; older ones no longer move the EWMA
+TREND_MAX_LOGS = 120
+
+# Per-user trend, updated in place as weigh-ins are logged. Each worker has
+# its own, so cached trends are checked against the weight logs on every read.
+_trends = TTLCache(
+    maxsize=settings.WEIGHT_TREND_CACHE_MAX_ENTRIES,
+    ttl=settings.WEIGHT_TREND_TTL_SECONDS
+)
+
+
+def _ewma_step(smoothed: float, weight: float, gap_days: int) -> float:
+    alpha = 1 - (1 - EWMA_ALPHA) ** max(gap_days, 1)
+    return smoothed + alpha * (weight - smoothed)
+
+
+def smooth(points: Iterable[Tuple[date, float]]) -> List[float]:
+    """
+    EWMA-smooth a weight series (e.g. daily or weekly averages), oldest first.
+
+    Returns:
+        Smoothed weight for each point
+    """
+    smoothed = []
+    previous_date = None
+    for day, weight in points:
+        if previous_date is None:
+            smoothed.append(weight)
+        else:
+            smoothed.append(_ewma_step(smoothed[-1], weight, (day - previous_date).days))
+        previous_date = day
+    return smoothed
+
+
+class WeightTrend:
+    """
+    EWMA-smoothed weight and least-squares slope of a user's weigh-ins.
+
+    Weigh-ins are added oldest first. Each add is O(1) (amortized): the
+    slope comes from running sums over the weigh-ins in the last
+    SLOPE_WINDOW_DAYS, which are dropped again as the window moves on.
+    """
+
+    def __init__(self):
+        self.smoothed: Optional[float] = None
+        self.last_weight: Optional[float] = None
+        self.last_date: Optional[date] = None
+        # (count, highest ID) of the user's weight logs the trend was built from
+        self.version: Tuple[int, Optional[int]] = (0, None)
+        self._origin: Optional[int] = None  # Day ordinal x is measured from
+        self._window: Deque[Tuple[int, float]] = deque()
+        self._n = 0
+        self._sum_x = 0.0
+        self._sum_y = 0.0
+        self._sum_xx = 0.0
+        self._sum_xy = 0.0
+
+    def _accumulate(self, x: int, y: float, sign: int) -> None:
+        self._n += sign
+        self._sum_x += sign * x
+        self._sum_y += sign * y
+        self._sum_xx += sign * x * x
+        self._sum_xy += sign * x * y
+
+    def add(self, day: date, weight: float) -> None:
+        """
+        Add a weigh-in.
+
+        Raises:
+            ValueError: If it is older than the last weigh-in added
+        """
+        if self.last_date is not None and day < self.last_date:
+            raise ValueError("Weigh-ins must be added in date order")
+
+        if self.smoothed is None:
+            self.smoothed = weight
+            self._origin = day.toordinal()
+        else:
+            self.smoothed = _ewma_step(self.smoothed, weight, (day - self.last_date).days)
+
+        self.last_weight = weight
+        self.last_date = day
+
+        x = day.toordinal() - self._origin
+        self._window.append((x, weight))
+        self._accumulate(x, weight, 1)
+        while self._window[0][0] <= x - SLOPE_WINDOW_DAYS:
+            self._accumulate(*self._window.popleft(), -1)
+
+    @property
+    def kg_per_week(self) -> Optional[float]:
+        """Least-squares slope over the last SLOPE_WINDOW_DAYS, or None with too few days."""
+        if self._n < MIN_SLOPE_POINTS:
+            return None
+        denominator = self._n * self._sum_xx - self._sum_x ** 2
+        if denominator <= 0:
+            return None  # All weigh-ins on the same day
+        return (self._n * self._sum_xy - self._sum_x * self._sum_y) / denominator * 7
+
+    @property
+    def direction(self) -> str:
+        """"increasing", "decreasing" or "stable"."""
+        slope = self.kg_per_week
+        if slope is None or abs(slope) < STABLE_KG_PER_WEEK:
+            return "stable"
+        return "increasing" if slope > 0 else "decreasing"
+
+
+def weight_log_version_query(user_id: int) -> Select:
+    """Build the query behind get_weight_log_version."""
+    return select(func.count(WeightLog.id), func.max(WeightLog.id)).where(WeightLog.user_id == user_id)
+
+
+def weight_trend_query(user_id: int) -> Select:
+    """Build the query for a user's latest TREND_MAX_LOGS weigh-ins, newest first."""
+    return select(WeightLog.date, WeightLog.weight).where(
+        WeightLog.user_id == user_id
+    ).order_by(WeightLog.date.desc(), WeightLog.id.desc()).limit(TREND_MAX_LOGS)
+
+
+async def get_weight_log_version(user_id: int, db: AsyncSession) -> Tuple[int, Optional[int]]:
+    """
+    Get the count and highest ID of a user's weight logs.
+
+    Weight logs are only added (with increasing IDs) or deleted, never
+    edited, so this changes whenever the logs do. It is read from the
+    (user_id, date, id) index.
+    """
+    row = (await db.execute(weight_log_version_query(user_id))).one()
+    return row[0], row[1]
+
+
+async def build_weight_trend(user_id: int, db: AsyncSession) -> WeightTrend:
+    """Compute a user's trend from their latest TREND_MAX_LOGS weigh-ins."""
+    rows = (await db.execute(weight_trend_query(user_id))).all()
+
+    trend = WeightTrend()
+    for row in reversed(rows):
+        trend.add(row.date, row.weight)
+    return trend
+
+
+async def get_weight_trend(user_id: int, db: AsyncSession) -> WeightTrend:
+    """
+    Get a user's weight trend, from the cache when it is still current.
+
+    A cached trend is used only if the user's weight logs haven't changed
+    since it was built (see get_weight_log_version), so weigh-ins logged
+    or deleted through another worker are never missed.
+
+    The cached trend is shared by the weight history and the chat coach;
+    treat it as read-only (use record_weigh_in to update it).
+    """
+    version = await get_weight_log_version(user_id, db)
+    trend = _trends.get(user_id)
+    if trend is None or trend.version != version:
+        trend = await build_weight_trend(user_id, db)
+        trend.version = version
+        _trends.set(user_id, trend)
+    return trend
+
+
+def record_weigh_in(user_id: int, log_id: int, day: date, weight: float) -> None:
+    """
+    Add a newly committed weigh-in to the user's cached trend.
+
+    A trend rebuilt by a concurrent request after the commit already
+    contains the weigh-in (its version covers the log's ID), so it is
+    skipped rather than counted twice. A weigh-in dated before the latest
+    one can't be added incrementally, so the trend is dropped and rebuilt
+    on next use instead.
+    """
+    trend = _trends.get(user_id)
+    if trend is None:
+        return
+    count, max_id = trend.version
+    if max_id is not None and log_id <= max_id:
+        return
+    if trend.last_date is not None and day < trend.last_date:
+        _trends.delete(user_id)
+        return
+    trend.add(day, weight)
+    trend.version = (count + 1, log_id)
+
+
+def invalidate_weight_trend(user_id: int) -> None:
+    """Drop a user's cached trend. Call when a weigh-in is deleted or changed."""
+    _trends.delete(user_id)
+
+
+def clear_weight_trends() -> None:
+    """Drop all cached trends."""
+    _trends.clear()
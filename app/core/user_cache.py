@@ -0,0 +1,36 @@
+from typing import Optional
+from app.config import settings
+from app.core.cache import TTLCache
+from app.models.user import User
+
+# Authenticated users keyed on their token subject (user ID, or email for old tokens)
+_users = TTLCache(
+    maxsize=settings.AUTH_USER_CACHE_MAX_ENTRIES,
+    ttl=settings.AUTH_USER_CACHE_TTL_SECONDS
+)
+
+
+def get_cached_user(subject: str) -> Optional[User]:
+    """Get a cached user by token subject, or None if not cached."""
+    return _users.get(subject)
+
+
+def cache_user(subject: str, user: User) -> None:
+    """
+    Cache a user loaded for a token subject.
+
+    The user must be detached from its session (see Session.expunge) so
+    concurrent requests can share it; treat it as read-only.
+    """
+    _users.set(subject, user)
+
+
+def invalidate_user(user: User) -> None:
+    """Drop a user from the cache. Call after changing or deleting a user."""
+    _users.delete(str(user.id))
+    _users.delete(user.email)
+
+
+def clear_user_cache() -> None:
+    """Drop all cached users."""
+    _users.clear()
@@ -0,0 +1,213 @@
+import base64
+from datetime import date
+from typing import List, Optional, Tuple
+from sqlalchemy import Date, and_, cast, func, literal_column, or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.sql import Select
+from app.core.trend import smooth
+from app.models.weight_log import WeightLog
+
+# Chart series bucket sizes
+RESOLUTIONS = ("daily", "weekly")
+
+
+def encode_cursor(log_date: date, log_id: int) -> str:
+    """Encode the position after a log (newest first) as an opaque page cursor."""
+    return base64.urlsafe_b64encode(f"{log_date.isoformat()}:{log_id}".encode()).decode()
+
+
+def decode_cursor(cursor: str) -> Tuple[date, int]:
+    """
+    Decode a page cursor from encode_cursor.
+
+    Raises:
+        ValueError: If the cursor is malformed
+    """
+    try:
+        log_date, log_id = base64.urlsafe_b64decode(cursor.encode()).decode().split(":")
+        return date.fromisoformat(log_date), int(log_id)
+    except (UnicodeError, ValueError) as e:
+        raise ValueError("Invalid cursor") from e
+
+
+def _filters(user_id: int, start_date: Optional[date]) -> list:
+    filters = [WeightLog.user_id == user_id]
+    if start_date:
+        filters.append(WeightLog.date >= start_date)
+    return filters
+
+
+def weight_stats_query(user_id: int, start_date: Optional[date] = None) -> Select:
+    """Build the aggregate query behind get_weight_stats."""
+    filters = _filters(user_id, start_date)
+
+    def weights(newest_first: bool, limit: int):
+        order = (WeightLog.date.desc(), WeightLog.id.desc()) if newest_first else (WeightLog.date, WeightLog.id)
+        return select(WeightLog.weight).where(*filters).order_by(*order).limit(limit)
+
+    return select(
+        func.count(WeightLog.id).label("count"),
+        func.min(WeightLog.weight).label("lowest"),
+        func.max(WeightLog.weight).label("highest"),
+        func.avg(WeightLog.weight).label("average"),
+        weights(newest_first=False, limit=1).scalar_subquery().label("first"),
+        weights(newest_first=True, limit=1).scalar_subquery().label("last")
+    ).where(*filters)
+
+
+async def get_weight_stats(db: AsyncSession, user_id: int, start_date: Optional[date] = None) -> Optional[dict]:
+    """
+    Compute weight statistics in one aggregate query.
+
+    Args:
+        db: Database session
+        user_id: User ID
+        start_date: Only include logs on or after this date (None for all)
+
+    Returns:
+        dict with count, lowest, highest, average, first and last weight,
+        or None if the user has no logs in the range
+    """
+    row = (await db.execute(weight_stats_query(user_id, start_date))).one()
+
+    if not row.count:
+        return None
+
+    return {
+        "count": row.count,
+        "lowest": row.lowest,
+        "highest": row.highest,
+        "average": float(row.average),
+        "first": row.first,
+        "last": row.last,
+    }
+
+
+def weight_page_query(
+    user_id: int,
+    start_date: Optional[date] = None,
+    after: Optional[Tuple[date, int]] = None,
+    limit: int = 100
+) -> Select:
+    """
+    Build the query for a page of weight logs, newest first.
+
+    Args:
+        user_id: User ID
+        start_date: Only include logs on or after this date (None for all)
+        after: (date, id) of the last log on the previous page
+        limit: Maximum number of logs
+
+    Returns:
+        Select of WeightLog rows
+    """
+    query = select(WeightLog).where(*_filters(user_id, start_date))
+
+    if after is not None:
+        after_date, after_id = after
+        query = query.where(or_(
+            WeightLog.date < after_date,
+            and_(WeightLog.date == after_date, WeightLog.id < after_id)
+        ))
+
+    return query.order_by(WeightLog.date.desc(), WeightLog.id.desc()).limit(limit)
+
+
+def latest_weight_query(user_id: int) -> Select:
+    """Build the query for a user's most recent weight log."""
+    return select(WeightLog).where(WeightLog.user_id == user_id).order_by(WeightLog.date.desc()).limit(1)
+
+
+async def get_weight_page(
+    db: AsyncSession,
+    user_id: int,
+    start_date: Optional[date] = None,
+    cursor: Optional[str] = None,
+    limit: int = 100
+) -> Tuple[List[WeightLog], Optional[str]]:
+    """
+    Get one page of weight logs, newest first.
+
+    Pages are keyed on (date, id) rather than offsets, so each page is a
+    range scan of the (user_id, date, id) index however deep it is.
+
+    Args:
+        db: Database session
+        user_id: User ID
+        start_date: Only include logs on or after this date (None for all)
+        cursor: next_cursor from the previous page (None for the first page)
+        limit: Page size
+
+    Returns:
+        Tuple of (logs, next_cursor); next_cursor is None on the last page
+
+    Raises:
+        ValueError: If the cursor is malformed
+    """
+    after = decode_cursor(cursor) if cursor else None
+
+    # Fetch one extra row to tell whether there is another page
+    logs = list((await db.execute(
+        weight_page_query(user_id, start_date, after, limit + 1)
+    )).scalars().all())
+
+    if len(logs) <= limit:
+        return logs, None
+
+    logs = logs[:limit]
+    return logs, encode_cursor(logs[-1].date, logs[-1].id)
+
+
+def _week_start(db: AsyncSession):
+    """SQL expression for the Monday of the week of a log's date."""
+    if db.get_bind().dialect.name == "sqlite":
+        return func.date(WeightLog.date, literal_column("'weekday 0'"), literal_column("'-6 days'"))
+    # A literal rather than a bound parameter, so GROUP BY matches the selected expression
+    return cast(func.date_trunc(literal_column("'week'"), WeightLog.date), Date)
+
+
+async def get_weight_series(
+    db: AsyncSession,
+    user_id: int,
+    resolution: str,
+    start_date: Optional[date] = None
+) -> List[dict]:
+    """
+    Get average weight per day or week, oldest first, for charts, with an
+    EWMA-smoothed trend line through the averages.
+
+    Args:
+        db: Database session
+        user_id: User ID
+        resolution: "daily" or "weekly" (weeks start on Monday)
+        start_date: Only include logs on or after this date (None for all)
+
+    Returns:
+        List of dicts with date (bucket start), weight, trend and count
+    """
+    bucket = WeightLog.date if resolution == "daily" else _week_start(db)
+
+    result = await db.execute(
+        select(
+            bucket.label("bucket"),
+            func.avg(WeightLog.weight).label("weight"),
+            func.count(WeightLog.id).label("count")
+        ).where(*_filters(user_id, start_date)).group_by(bucket).order_by(bucket)
+    )
+
+    series = [
+        {
+            # SQLite's date() returns text
+            "date": date.fromisoformat(row.bucket) if isinstance(row.bucket, str) else row.bucket,
+            "weight": float(row.weight),
+            "count": row.count,
+        }
+        for row in result
+    ]
+
+    trend_line = smooth((point["date"], point["weight"]) for point in series)
+    for point, smoothed in zip(series, trend_line):
+        point["weight"] = round(point["weight"], 2)
+        point["trend"] = round(smoothed, 2)
+
+    return series
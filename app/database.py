@@ -1,26 +1,125 @@
-from sqlalchemy import create_engine
+from typing import AsyncGenerator, Callable, Dict, Any
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm import Session
 from app.config import settings
 
+# Async drivers for each supported database
+ASYNC_DRIVERS = {
+    "postgresql": "postgresql+asyncpg",
+    "sqlite": "sqlite+aiosqlite",
+}
+
+
+def get_async_database_url() -> str:
+    """
+    Get the database URL for the async engine.
+
+    Uses ASYNC_DATABASE_URL when set, otherwise swaps the driver of
+    DATABASE_URL for its async counterpart (asyncpg or aiosqlite), so the
+    same .env works for both the app and Alembic.
+    """
+    if settings.ASYNC_DATABASE_URL:
+        return settings.ASYNC_DATABASE_URL
+
+    scheme, separator, rest = settings.DATABASE_URL.partition("://")
+    backend = scheme.split("+")[0]
+    if backend not in ASYNC_DRIVERS:
+        raise ValueError(f"No async driver configured for database '{backend}'")
+
+    return f"{ASYNC_DRIVERS[backend]}{separator}{rest}"
+
+
+def get_engine_options(url: str) -> Dict[str, Any]:
+    """Get connection pool and logging options for the engine."""
+    options: Dict[str, Any] = {
+        "echo": settings.DB_ECHO,
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,
+        "pool_recycle": settings.DB_POOL_RECYCLE,
+    }
+
+    # SQLite opens a connection per checkout, so sizing options don't apply
+    if not url.startswith("sqlite"):
+        options.update(
+            pool_size=settings.DB_POOL_SIZE,
+            max_overflow=settings.DB_MAX_OVERFLOW,
+            pool_timeout=settings.DB_POOL_TIMEOUT,
+        )
+
+    return options
+
+
 # Create database engine
-engine = create_engine(
-    settings.DATABASE_URL,
-    connect_args={"check_same_thread": False} if "sqlite" in settings.DATABASE_URL else {},
-    echo=settings.DEBUG
-)
+ASYNC_DATABASE_URL = get_async_database_url()
+engine = create_async_engine(ASYNC_DATABASE_URL, **get_engine_options(ASYNC_DATABASE_URL))
 
 # Create session factory
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+AsyncSessionLocal = async_sessionmaker(
+    bind=engine,
+    autoflush=False,
+    expire_on_commit=False
+)
 
 # Create base class for models
 Base = declarative_base()
 
+# Session.info key of the callbacks waiting for the transaction to commit
+_AFTER_COMMIT_KEY = "after_commit_callbacks"
+
+
+def call_after_commit(db: AsyncSession, callback: Callable[[], None]) -> None:
+    """
+    Run a callback once the session's transaction commits.
+
+    Use it to invalidate in-memory caches of database rows: invalidating
+    before the commit lets a concurrent request re-cache the old rows.
+    The callback is dropped if the transaction rolls back.
+    """
+    db.sync_session.info.setdefault(_AFTER_COMMIT_KEY, []).append(callback)
+
+
+@event.listens_for(Session, "after_commit")
+def _run_after_commit_callbacks(session: Session) -> None:
+    for callback in session.info.pop(_AFTER_COMMIT_KEY, []):
+        callback()
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_after_commit_callbacks(session: Session) -> None:
+    session.info.pop(_AFTER_COMMIT_KEY, None)
+
+
+def get_dialect_insert(db: AsyncSession):
+    """Get the dialect-specific INSERT construct that supports ON CONFLICT."""
+    dialect = db.get_bind().dialect.name
+    if dialect == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    elif dialect == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert
+    else:
+        raise NotImplementedError(f"Upserts are not supported for dialect '{dialect}'")
+    return insert
+
+
+def get_pool_status() -> Dict[str, Any]:
+    """Report connection pool usage, for sizing the pool under load."""
+    pool = engine.pool
+    status: Dict[str, Any] = {"type": type(pool).__name__}
+
+    if hasattr(pool, "checkedout"):
+        status.update(
+            size=pool.size(),
+            checked_in=pool.checkedin(),
+            checked_out=pool.checkedout(),
+            overflow=max(pool.overflow(), 0),
+            max_overflow=settings.DB_MAX_OVERFLOW,
+        )
+
+    return status
+
 
 # Dependency to get DB session
-def get_db():
-    db = SessionLocal()
-    try:
+async def get_db() -> AsyncGenerator[AsyncSession, None]:
+    async with AsyncSessionLocal() as db:
         yield db
-    finally:
-        db.close()
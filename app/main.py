@@ -1,17 +1,42 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from app.config import settings
-from app.database import Base, engine
+from app.database import engine, get_pool_status
 from app.api.routes import auth, food, weight, streak, chat, widget
+from app.services.ocr_cache import get_ocr_cache_stats
+from app.services.conversations import get_chat_history_stats
+from app.services.openfoodfacts import close_clients
+from app.core.security import start_password_executor, shutdown_password_executor
+from app.services.gemini import init_models, warm_up_models
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Start the password worker pool and warm up Gemini models on startup (if
+    enabled), and release connections and workers on shutdown.
+
+    The schema is not touched here; run `python -m app.cli migrate` once per
+    deploy before starting the workers. Gemini models are otherwise built on
+    first use.
+    """
+    start_password_executor()
+    if settings.GEMINI_WARMUP:
+        init_models()
+        await warm_up_models()
+    yield
+    await close_clients()
+    shutdown_password_executor()
+    await engine.dispose()
 
-# Create database tables
-Base.metadata.create_all(bind=engine)
 
 # Create FastAPI app
 app = FastAPI(
     title=settings.APP_NAME,
     debug=settings.DEBUG,
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
 # Configure CORS
@@ -33,7 +58,7 @@ app.include_router(widget.router, prefix="/api/widget", tags=["Widget"])
 
 
 @app.get("/")
-def root():
+async def root():
     """Root endpoint."""
     return {
         "app": settings.APP_NAME,
@@ -43,6 +68,11 @@ def root():
 
 
 @app.get("/health")
-def health_check():
+async def health_check():
     """Health check endpoint."""
-    return {"status": "healthy"}
+    return {
+        "status": "healthy",
+        "db_pool": get_pool_status(),
+        "ocr_cache": get_ocr_cache_stats(),
+        "chat_history": get_chat_history_stats()
+    }
@@ -2,5 +2,10 @@ from app.models.user import User
 from app.models.food import FoodItem
 from app.models.food_log import FoodLog
 from app.models.weight_log import WeightLog
+from app.models.daily_activity import DailyActivity
+from app.models.ocr_cache import OCRCacheEntry
+from app.models.food_search import FoodSearchEnrichment
+from app.models.conversation import Conversation, ConversationMessage
 
-__all__ = ["User", "FoodItem", "FoodLog", "WeightLog"]
+__all__ = ["User", "FoodItem", "FoodLog", "WeightLog", "DailyActivity", "OCRCacheEntry",
+           "FoodSearchEnrichment", "Conversation", "ConversationMessage"]
@@ -0,0 +1,30 @@
+from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey
+from sqlalchemy.orm import relationship
+from sqlalchemy.sql import func
+from app.database import Base
+
+
+class Conversation(Base):
+    """Chat with the AI coach, with a rolling summary of its older messages."""
+    __tablename__ = "conversations"
+
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
+    summary = Column(Text, nullable=True)  # Covers messages up to summarized_until
+    summarized_until = Column(Integer, nullable=True)  # ID of the last summarized message
+    token_count = Column(Integer, nullable=False, default=0)  # Estimated tokens of all messages
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+    # Relationship
+    user = relationship("User")
+
+
+class ConversationMessage(Base):
+    __tablename__ = "conversation_messages"
+
+    id = Column(Integer, primary_key=True, index=True)
+    conversation_id = Column(Integer, ForeignKey("conversations.id", ondelete="CASCADE"), nullable=False, index=True)
+    role = Column(String, nullable=False)  # "user" or "assistant"
+    content = Column(Text, nullable=False)
+    token_count = Column(Integer, nullable=False)  # Estimated
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
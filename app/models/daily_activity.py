@@ -0,0 +1,24 @@
+from sqlalchemy import Column, Integer, Float, Date, Boolean, ForeignKey, UniqueConstraint
+from sqlalchemy.orm import relationship
+from app.database import Base
+
+
+class DailyActivity(Base):
+    """Per-user daily rollup of food and weight logs, maintained on write."""
+    __tablename__ = "daily_activity"
+    __table_args__ = (
+        UniqueConstraint("user_id", "date", name="uq_daily_activity_user_date"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
+    date = Column(Date, nullable=False)
+    calories_total = Column(Float, nullable=False, default=0.0)
+    protein_total = Column(Float, nullable=False, default=0.0)  # grams
+    carbs_total = Column(Float, nullable=False, default=0.0)    # grams
+    fat_total = Column(Float, nullable=False, default=0.0)      # grams
+    food_log_count = Column(Integer, nullable=False, default=0)
+    has_weight = Column(Boolean, nullable=False, default=False)
+
+    # Relationship
+    user = relationship("User")
@@ -1,4 +1,5 @@
-from sqlalchemy import Column, Integer, String, Float
+from sqlalchemy import Column, Integer, String, Float, DateTime, DDL, Index, event, literal_column
+from sqlalchemy.sql import func
 from app.database import Base
 
 
@@ -12,3 +13,68 @@ class FoodItem(Base):
     carbs = Column(Float, default=0.0)    # grams per 100g
     fat = Column(Float, default=0.0)      # grams per 100g
     barcode = Column(String, unique=True, index=True, nullable=True)
+    source = Column(String, nullable=True)  # "openfoodfacts" or None for manual entries
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+    __table_args__ = (
+        # PostgreSQL full-text search (see app.core.food_search): trigram index
+        # for fuzzy/substring matches, tsvector index for prefix matches
+        Index(
+            "ix_food_items_name_trgm",
+            name,
+            postgresql_using="gin",
+            postgresql_ops={"name": "gin_trgm_ops"}
+        ).ddl_if(dialect="postgresql"),
+        Index(
+            "ix_food_items_name_tsv",
+            func.to_tsvector(literal_column("'simple'"), name),
+            postgresql_using="gin"
+        ).ddl_if(dialect="postgresql"),
+    )
+
+
+# Full-text search on food names (see app.core.food_search)
+
+# PostgreSQL: same expression as ix_food_items_name_tsv, so queries can use the index
+FOOD_NAME_TSVECTOR = func.to_tsvector(literal_column("'simple'"), FoodItem.__table__.c.name)
+
+event.listen(
+    FoodItem.__table__,
+    "before_create",
+    DDL("CREATE EXTENSION IF NOT EXISTS pg_trgm").execute_if(dialect="postgresql")
+)
+
+# SQLite: FTS5 table kept in sync with food_items by triggers
+SQLITE_FTS_DDL = [
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS food_items_fts USING fts5(
+        name, content='food_items', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2', prefix='2 3'
+    )
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS food_items_fts_ai AFTER INSERT ON food_items BEGIN
+        INSERT INTO food_items_fts(rowid, name) VALUES (new.id, new.name);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS food_items_fts_ad AFTER DELETE ON food_items BEGIN
+        INSERT INTO food_items_fts(food_items_fts, rowid, name) VALUES ('delete', old.id, old.name);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS food_items_fts_au AFTER UPDATE OF name ON food_items BEGIN
+        INSERT INTO food_items_fts(food_items_fts, rowid, name) VALUES ('delete', old.id, old.name);
+        INSERT INTO food_items_fts(rowid, name) VALUES (new.id, new.name);
+    END
+    """,
+]
+
+for statement in SQLITE_FTS_DDL:
+    event.listen(FoodItem.__table__, "after_create", DDL(statement).execute_if(dialect="sqlite"))
+
+event.listen(
+    FoodItem.__table__,
+    "after_drop",
+    DDL("DROP TABLE IF EXISTS food_items_fts").execute_if(dialect="sqlite")
+)
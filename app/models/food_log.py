@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, Float, Date, ForeignKey, String
+from sqlalchemy import Column, Integer, Float, Date, ForeignKey, String, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from app.database import Base
@@ -6,12 +6,25 @@ from app.database import Base
 
 class FoodLog(Base):
     __tablename__ = "food_logs"
+    __table_args__ = (
+        # Per-user date lookups, ordered by (date, id); on PostgreSQL it also
+        # covers the log listing so the table isn't touched
+        Index(
+            "ix_food_logs_user_id_date",
+            "user_id", "date", "id",
+            postgresql_include=["food_id", "weight_grams", "calories", "weight_method"]
+        ),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
-    user_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
     food_id = Column(Integer, ForeignKey("food_items.id"), nullable=False)
     weight_grams = Column(Float, nullable=False)
     calories = Column(Float, nullable=False)
+    # Macros of the logged amount, fixed when logged like calories (grams)
+    protein = Column(Float, default=0.0)
+    carbs = Column(Float, default=0.0)
+    fat = Column(Float, default=0.0)
     date = Column(Date, nullable=False, index=True, server_default=func.current_date())
     weight_method = Column(String, nullable=False, default="manual")  # "manual" or "ocr"
 
@@ -0,0 +1,12 @@
+from sqlalchemy import Column, String, Text, DateTime
+from app.database import Base
+
+
+class FoodSearchEnrichment(Base):
+    """OpenFoodFacts fetch for a search query, shared across workers."""
+    __tablename__ = "food_search_enrichments"
+
+    query = Column(String, primary_key=True)  # Normalized search query
+    food_ids = Column(Text, nullable=True)  # JSON list of the fetched food item IDs, once fetched
+    started_at = Column(DateTime(timezone=True), nullable=False)
+    fetched_at = Column(DateTime(timezone=True), nullable=True)  # NULL while the fetch is running
@@ -0,0 +1,14 @@
+from sqlalchemy import Column, String, Float, DateTime
+from sqlalchemy.sql import func
+from app.database import Base
+
+
+class OCRCacheEntry(Base):
+    """OCR result shared across workers, keyed on image hash and prompt version."""
+    __tablename__ = "ocr_cache"
+
+    key = Column(String, primary_key=True)
+    weight = Column(Float, nullable=False)
+    confidence = Column(String, nullable=False)
+    message = Column(String, nullable=False)
+    created_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
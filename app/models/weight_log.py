@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, Float, Date, ForeignKey, String
+from sqlalchemy import Column, Integer, Float, Date, ForeignKey, String, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from app.database import Base
@@ -6,9 +6,17 @@ from app.database import Base
 
 class WeightLog(Base):
     __tablename__ = "weight_logs"
+    __table_args__ = (
+        # Per-user history and latest-weight lookups, ordered by (date, id)
+        Index(
+            "ix_weight_logs_user_id_date",
+            "user_id", "date", "id",
+            postgresql_include=["weight", "method"]
+        ),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
-    user_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
     weight = Column(Float, nullable=False)  # in kg
     date = Column(Date, nullable=False, index=True, server_default=func.current_date())
     method = Column(String, nullable=False, default="manual")  # "manual" or "ocr"
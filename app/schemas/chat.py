@@ -9,8 +9,10 @@ class ChatMessage(BaseModel):
 
 class ChatRequest(BaseModel):
     message: str
-    history: Optional[List[ChatMessage]] = []
+    conversation_id: Optional[int] = None  # Omit to start a new conversation
+    history: Optional[List[ChatMessage]] = []  # Older app versions: answered without storing, if no conversation_id
 
 
 class ChatResponse(BaseModel):
     response: str
+    conversation_id: Optional[int] = None  # None when answered from request history
@@ -35,8 +35,19 @@ class WeightStats(BaseModel):
     current: Optional[float] = None
     change_from_start: Optional[float] = None
     trend: str  # "increasing", "decreasing", "stable"
+    smoothed: Optional[float] = None  # EWMA of recent weigh-ins, in kg
+    kg_per_week: Optional[float] = None  # Fitted rate of change over the last 4 weeks
+
+
+class WeightPoint(BaseModel):
+    date: date  # Start of the day or week
+    weight: float  # Average in kg
+    trend: float  # EWMA-smoothed average, in kg
+    count: int  # Logs in the bucket
 
 
 class WeightHistory(BaseModel):
-    logs: List[WeightLog]
+    logs: List[WeightLog]  # One page, newest first
     stats: WeightStats
+    next_cursor: Optional[str] = None  # Pass as cursor to get the next page; None on the last page
+    series: Optional[List[WeightPoint]] = None  # Set when a resolution is requested
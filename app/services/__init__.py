@@ -5,7 +5,9 @@ from app.services.gemini import (
 )
 from app.services.openfoodfacts import (
     search_food_by_barcode,
-    search_food_by_name
+    search_food_by_barcode_async,
+    search_food_by_name,
+    search_food_by_name_async
 )
 
 __all__ = [
@@ -13,5 +15,7 @@ __all__ = [
     "extract_body_weight_from_image",
     "chat_with_gemini",
     "search_food_by_barcode",
-    "search_food_by_name"
+    "search_food_by_barcode_async",
+    "search_food_by_name",
+    "search_food_by_name_async"
 ]
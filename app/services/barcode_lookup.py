@@ -0,0 +1,117 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Optional, Set
+from app.config import settings
+from app.core.cache import TTLCache
+from app.database import AsyncSessionLocal
+from app.models.food import FoodItem
+from app.services.openfoodfacts import fetch_food_by_barcode_async
+
+# Barcodes OpenFoodFacts doesn't know, so repeat scans skip the remote lookup
+_misses = TTLCache(
+    maxsize=settings.BARCODE_MISS_CACHE_MAX_ENTRIES,
+    ttl=settings.BARCODE_MISS_TTL_SECONDS
+)
+
+# Lookups currently in progress, shared by concurrent requests for the same barcode
+_in_flight: Dict[str, "asyncio.Task[Optional[Dict]]"] = {}
+
+# Food items with a background refresh already scheduled
+_refreshing: Set[int] = set()
+
+
+async def _fetch(barcode: str) -> Optional[Dict]:
+    """Fetch a barcode from OpenFoodFacts, remembering misses."""
+    result = await fetch_food_by_barcode_async(barcode)
+    if result is None:
+        _misses.set(barcode, True)
+    return result
+
+
+async def lookup_barcode(barcode: str) -> Optional[Dict]:
+    """
+    Look up a barcode on OpenFoodFacts with miss caching and single-flight.
+
+    Unknown barcodes are remembered for BARCODE_MISS_TTL_SECONDS, and
+    concurrent lookups of the same barcode share one remote request.
+    Network errors are not cached.
+
+    Args:
+        barcode: Product barcode
+
+    Returns:
+        Dictionary with food information or None if not found or unavailable
+    """
+    if _misses.get(barcode):
+        return None
+
+    task = _in_flight.get(barcode)
+    if task is None:
+        task = asyncio.create_task(_fetch(barcode))
+        _in_flight[barcode] = task
+        task.add_done_callback(lambda _: _in_flight.pop(barcode, None))
+
+    try:
+        # Shield so one caller disconnecting doesn't cancel the shared lookup
+        return await asyncio.shield(task)
+    except asyncio.CancelledError:
+        raise
+    except Exception as e:
+        print(f"Error fetching barcode {barcode}: {str(e)}")
+        return None
+
+
+def is_stale(food_item: FoodItem) -> bool:
+    """Check whether an OpenFoodFacts item's nutrition data is due for a refresh."""
+    if food_item.source != "openfoodfacts" or not food_item.barcode:
+        return False
+    if food_item.updated_at is None:
+        return True
+
+    updated_at = food_item.updated_at
+    if updated_at.tzinfo is None:
+        updated_at = updated_at.replace(tzinfo=timezone.utc)
+
+    age = datetime.now(timezone.utc) - updated_at
+    return age > timedelta(days=settings.FOOD_REFRESH_AFTER_DAYS)
+
+
+def schedule_refresh(food_item: FoodItem) -> bool:
+    """
+    Mark a stale item for refresh, unless a refresh is already pending.
+
+    Returns:
+        True if the caller should run refresh_food_item for this item
+    """
+    if food_item.id in _refreshing:
+        return False
+    _refreshing.add(food_item.id)
+    return True
+
+
+async def refresh_food_item(food_id: int, barcode: str) -> None:
+    """
+    Re-fetch an item's nutrition data from OpenFoodFacts (run as a background task).
+
+    Args:
+        food_id: Food item ID
+        barcode: Food item barcode
+    """
+    try:
+        result = await lookup_barcode(barcode)
+        if result is None:
+            return
+
+        async with AsyncSessionLocal() as db:
+            food_item = await db.get(FoodItem, food_id)
+            if food_item is None:
+                return
+
+            for field in ("name", "calories_per_100g", "protein", "carbs", "fat"):
+                setattr(food_item, field, result[field])
+            # Set explicitly so the item is marked fresh even when nothing changed
+            food_item.updated_at = datetime.now(timezone.utc)
+
+            await db.commit()
+    finally:
+        _refreshing.discard(food_id)
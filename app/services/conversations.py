@@ -0,0 +1,267 @@
+from typing import Dict, List, NamedTuple, Optional, Sequence, Set
+from sqlalchemy import func, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.sql import Select
+from app.config import settings
+from app.database import AsyncSessionLocal
+from app.models.conversation import Conversation, ConversationMessage
+from app.services.gemini import summarize_conversation
+
+# Rough token estimate for English text (Gemini averages about 4 characters per token)
+CHARS_PER_TOKEN = 4
+
+# Conversations with a summary update running
+_summarizing: Set[int] = set()
+
+# Prompt history tokens sent to the model vs. what resending the full conversation would cost
+_stats = {"turns": 0, "history_tokens_sent": 0, "history_tokens_saved": 0, "summaries": 0}
+
+
+class _HistoryMessage(NamedTuple):
+    role: str
+    content: str
+    token_count: int
+
+
+def estimate_tokens(text: str) -> int:
+    """Estimate the number of model tokens in a text."""
+    return max(1, -(-len(text) // CHARS_PER_TOKEN))
+
+
+def get_chat_history_stats() -> Dict[str, int]:
+    """Get prompt token savings since startup (reported by /health)."""
+    return dict(_stats)
+
+
+async def get_conversation(db: AsyncSession, user_id: int, conversation_id: int) -> Optional[Conversation]:
+    """Get one of a user's conversations, or None if it doesn't exist or isn't theirs."""
+    result = await db.execute(
+        select(Conversation).where(
+            Conversation.id == conversation_id,
+            Conversation.user_id == user_id
+        )
+    )
+    return result.scalars().first()
+
+
+async def create_conversation(db: AsyncSession, user_id: int) -> Conversation:
+    """
+    Start a conversation.
+
+    Returns:
+        The new conversation (flushed, so it has an ID)
+    """
+    conversation = Conversation(user_id=user_id, token_count=0)
+    db.add(conversation)
+    await db.flush()
+    return conversation
+
+
+def add_message(db: AsyncSession, conversation: Conversation, role: str, content: str) -> ConversationMessage:
+    """Append a message to a conversation (the caller commits)."""
+    message = ConversationMessage(
+        conversation_id=conversation.id,
+        role=role,
+        content=content,
+        token_count=estimate_tokens(content)
+    )
+    db.add(message)
+    conversation.token_count = (conversation.token_count or 0) + message.token_count
+    return message
+
+
+def _fit_window(messages: Sequence) -> list:
+    """
+    Take the newest messages that fit in CHAT_HISTORY_TOKEN_BUDGET.
+
+    Args:
+        messages: Messages with role and token_count, newest first
+
+    Returns:
+        The window, newest first
+    """
+    window = []
+    window_tokens = 0
+    for msg in messages:
+        if window_tokens + msg.token_count > settings.CHAT_HISTORY_TOKEN_BUDGET:
+            break
+        window.append(msg)
+        window_tokens += msg.token_count
+
+    # The model expects the history to open with a user turn
+    while window and window[-1].role != "user":
+        window.pop()
+
+    return window
+
+
+def _record_turn(sent_tokens: int, total_tokens: int) -> None:
+    _stats["turns"] += 1
+    _stats["history_tokens_sent"] += sent_tokens
+    _stats["history_tokens_saved"] += max(0, total_tokens - sent_tokens)
+
+
+def window_from_history(history: List[dict]) -> dict:
+    """
+    Get the recent messages of client-side history (older app versions)
+    that fit in CHAT_HISTORY_TOKEN_BUDGET. Nothing is stored.
+
+    Args:
+        history: Messages (dicts with 'role' and 'content'), oldest first
+
+    Returns:
+        dict like load_history_window's, without a summary
+    """
+    messages = [
+        _HistoryMessage(msg["role"], msg["content"], estimate_tokens(msg["content"]))
+        for msg in reversed(history)
+    ]
+    window = _fit_window(messages)
+    _record_turn(
+        sum(msg.token_count for msg in window),
+        sum(msg.token_count for msg in messages)
+    )
+
+    return {
+        "history": [{"role": msg.role, "content": msg.content} for msg in reversed(window)],
+        "summary": None,
+        "needs_summary": False,
+        "window_start_id": None,
+    }
+
+
+def _unsummarized(conversation_id: int, summarized_until: Optional[int]) -> list:
+    """Filters for a conversation's messages not yet folded into its summary."""
+    filters = [ConversationMessage.conversation_id == conversation_id]
+    if summarized_until is not None:
+        filters.append(ConversationMessage.id > summarized_until)
+    return filters
+
+
+def history_window_query(conversation_id: int, summarized_until: Optional[int] = None) -> Select:
+    """Build the query for a conversation's newest unsummarized messages, newest first."""
+    query = select(
+        ConversationMessage.id,
+        ConversationMessage.role,
+        ConversationMessage.content,
+        ConversationMessage.token_count
+    ).where(*_unsummarized(conversation_id, summarized_until))
+    return query.order_by(ConversationMessage.id.desc()).limit(settings.CHAT_HISTORY_MAX_MESSAGES)
+
+
+async def load_history_window(db: AsyncSession, conversation: Conversation) -> dict:
+    """
+    Get the recent messages that fit in CHAT_HISTORY_TOKEN_BUDGET.
+
+    Messages before the window are represented by the conversation's
+    rolling summary instead of being resent. Every message is always in
+    one or the other: while fewer than CHAT_SUMMARY_MIN_TOKENS have left
+    the window they stay in it (over budget) rather than being summarized,
+    and once more have, or older messages weren't even loaded, they are
+    summarized.
+
+    Args:
+        db: Database session
+        conversation: Conversation to load
+
+    Returns:
+        dict with history (dicts with 'role' and 'content', oldest first),
+        summary, and needs_summary (True when unsummarized messages are
+        left out of the window; see summarize_older_messages)
+    """
+    unsummarized = _unsummarized(conversation.id, conversation.summarized_until)
+    rows = (await db.execute(history_window_query(conversation.id, conversation.summarized_until))).all()
+
+    window = _fit_window(rows)
+    window_start_id = window[-1].id if window else None
+    loaded_all = len(rows) < settings.CHAT_HISTORY_MAX_MESSAGES
+
+    if loaded_all:
+        # Every unsummarized message was loaded, so the rest are all older than the window
+        dropped_tokens = sum(row.token_count for row in rows[len(window):])
+    else:
+        older = unsummarized
+        if window_start_id is not None:
+            older = [*unsummarized, ConversationMessage.id < window_start_id]
+        dropped_tokens = (await db.execute(
+            select(func.coalesce(func.sum(ConversationMessage.token_count), 0)).where(*older)
+        )).scalar_one()
+
+    if loaded_all and dropped_tokens < settings.CHAT_SUMMARY_MIN_TOKENS:
+        # Too little to be worth a summary yet, so keep it in the prompt until there is
+        window = list(rows)
+        window_start_id = window[-1].id if window else None
+        dropped_tokens = 0
+
+    summary_tokens = estimate_tokens(conversation.summary) if conversation.summary else 0
+
+    window_tokens = sum(row.token_count for row in window)
+    _record_turn(window_tokens + summary_tokens, conversation.token_count or 0)
+
+    return {
+        "history": [{"role": row.role, "content": row.content} for row in reversed(window)],
+        "summary": conversation.summary,
+        "needs_summary": dropped_tokens > 0,
+        "window_start_id": window_start_id,
+    }
+
+
+def schedule_summary(conversation_id: int) -> bool:
+    """
+    Mark a conversation for a summary update, unless one is already running.
+
+    Returns:
+        True if the caller should run summarize_older_messages for it
+    """
+    if conversation_id in _summarizing:
+        return False
+    _summarizing.add(conversation_id)
+    return True
+
+
+async def summarize_older_messages(conversation_id: int, before_id: Optional[int]) -> None:
+    """
+    Fold messages before the history window into the rolling summary (run as a background task).
+
+    Args:
+        conversation_id: Conversation ID
+        before_id: First message ID of the history window (None to summarize everything)
+    """
+    try:
+        async with AsyncSessionLocal() as db:
+            conversation = await db.get(Conversation, conversation_id)
+            if conversation is None:
+                return
+            previous_summary = conversation.summary
+            summarized_until = conversation.summarized_until
+
+            query = select(ConversationMessage.id, ConversationMessage.role, ConversationMessage.content).where(
+                *_unsummarized(conversation_id, summarized_until)
+            )
+            if before_id is not None:
+                query = query.where(ConversationMessage.id < before_id)
+
+            messages = (await db.execute(query.order_by(ConversationMessage.id))).all()
+
+        if not messages:
+            return
+
+        # No session is held open while the model runs
+        summary = await summarize_conversation(
+            previous_summary,
+            [{"role": msg.role, "content": msg.content} for msg in messages]
+        )
+        if summary is None:
+            return
+
+        async with AsyncSessionLocal() as db:
+            await db.execute(
+                update(Conversation).where(Conversation.id == conversation_id).values(
+                    summary=summary,
+                    summarized_until=messages[-1].id
+                )
+            )
+            await db.commit()
+        _stats["summaries"] += 1
+    finally:
+        _summarizing.discard(conversation_id)
@@ -1,35 +1,20 @@
-import google.generativeai as genai
-from PIL import Image
+import asyncio
 import io
-import re
-from typing import Tuple, Optional
+import json
+from typing import TYPE_CHECKING, AsyncIterator, Dict, Tuple, Optional
 from app.config import settings
+from app.services.ocr_cache import cached_ocr
 
-# Configure Gemini API
-genai.configure(api_key=settings.GEMINI_API_KEY)
+# The Gemini SDK and Pillow are slow to import, so they are loaded on first
+# use (see _genai and preprocess_image) rather than by every worker on boot
+if TYPE_CHECKING:
+    import google.generativeai as genai
 
+# Bump when a prompt changes so cached OCR results from the old prompt are ignored
+FOOD_WEIGHT_PROMPT_VERSION = "1"
+BODY_WEIGHT_PROMPT_VERSION = "1"
 
-def extract_food_weight_from_image(image_bytes: bytes) -> Tuple[Optional[float], str, str]:
-    """
-    Extract food weight from kitchen scale image using Gemini Vision.
-
-    Args:
-        image_bytes: Image bytes of kitchen scale
-
-    Returns:
-        Tuple of (weight_grams, confidence, message)
-        - weight_grams: Extracted weight in grams or None if extraction failed
-        - confidence: "high", "medium", or "low"
-        - message: Additional information or error message
-    """
-    try:
-        # Load image
-        image = Image.open(io.BytesIO(image_bytes))
-
-        # Use Gemini Vision model
-        model = genai.GenerativeModel('gemini-1.5-flash')
-
-        prompt = """
+FOOD_WEIGHT_PROMPT = """
         You are analyzing an image of a kitchen scale showing food weight.
 
         Instructions:
@@ -52,18 +37,275 @@ def extract_food_weight_from_image(image_bytes: bytes) -> Tuple[Optional[float],
         }
         """
 
-        response = model.generate_content([prompt, image])
-        response_text = response.text.strip()
+BODY_WEIGHT_PROMPT = """
+        You are analyzing an image of a body weighing scale.
+
+        Instructions:
+        1. Look for the body weight displayed on the scale
+        2. Extract ONLY the weight number
+        3. Convert to kilograms if shown in pounds or other units (1 lb = 0.453592 kg)
+        4. Return ONLY a JSON object with this exact format:
+        {
+            "weight_kg": <number>,
+            "confidence": "<high|medium|low>",
+            "unit_detected": "<kg|lb|st>"
+        }
+
+        If the image is unclear or weight cannot be determined, return:
+        {
+            "weight_kg": null,
+            "confidence": "low",
+            "unit_detected": "unknown"
+        }
+        """
+
+COACH_SYSTEM_PROMPT = """
+    You are FitWit's AI nutrition coach. You provide personalized guidance on:
+    - Meal planning and suggestions
+    - Calorie tracking insights
+    - Weight trend analysis
+    - Motivation and encouragement
+    - Nutrition education
+
+    Keep responses concise, friendly, and actionable. Use the user's data to give personalized advice.
+    """
+
+SUMMARY_PROMPT = """
+    Summarize this conversation between a user and their nutrition coach in at most
+    150 words. Keep facts the coach needs later: goals, preferences, restrictions,
+    advice given and open questions. Write plain text, no headings.
+
+    Summary so far:
+    {summary}
+
+    New messages:
+    {transcript}
+    """
+
+# Models by purpose, built once and shared by all requests (see get_model)
+_models: Dict[str, "genai.GenerativeModel"] = {}
+
+_genai_module = None
+
+
+def _genai():
+    """
+    Import and configure the Gemini SDK on first use.
+
+    Raises:
+        RuntimeError: If GEMINI_API_KEY is not set
+    """
+    global _genai_module
+    if _genai_module is None:
+        if not settings.GEMINI_API_KEY:
+            raise RuntimeError("GEMINI_API_KEY is not set")
+
+        import google.generativeai as genai
+
+        genai.configure(api_key=settings.GEMINI_API_KEY)
+        _genai_module = genai
+    return _genai_module
 
-        # Parse JSON response
-        import json
-        # Extract JSON from markdown code blocks if present
-        if "```json" in response_text:
-            response_text = response_text.split("```json")[1].split("```")[0].strip()
-        elif "```" in response_text:
-            response_text = response_text.split("```")[1].split("```")[0].strip()
 
-        result = json.loads(response_text)
+def _model_settings() -> Dict[str, Tuple[str, dict]]:
+    """Model name and generation config for each purpose, from Settings."""
+    def config(temperature: Optional[float], max_output_tokens: Optional[int] = None) -> dict:
+        values = {"temperature": temperature, "max_output_tokens": max_output_tokens}
+        return {key: value for key, value in values.items() if value is not None}
+
+    return {
+        "ocr": (settings.GEMINI_OCR_MODEL, config(settings.GEMINI_OCR_TEMPERATURE)),
+        "chat": (
+            settings.GEMINI_CHAT_MODEL,
+            config(settings.GEMINI_CHAT_TEMPERATURE, settings.GEMINI_CHAT_MAX_OUTPUT_TOKENS)
+        ),
+        "summary": (settings.GEMINI_SUMMARY_MODEL, config(settings.GEMINI_SUMMARY_TEMPERATURE)),
+    }
+
+
+def get_model(purpose: str) -> "genai.GenerativeModel":
+    """
+    Get the shared model for a purpose ("ocr", "chat" or "summary").
+
+    Args:
+        purpose: What the model is used for
+
+    Returns:
+        Model configured from the GEMINI_*_MODEL / GEMINI_*_TEMPERATURE settings
+    """
+    model = _models.get(purpose)
+    if model is None:
+        name, generation_config = _model_settings()[purpose]
+        model = _genai().GenerativeModel(name, generation_config=generation_config or None)
+        _models[purpose] = model
+    return model
+
+
+def init_models() -> None:
+    """Build all models up front (called on app startup when GEMINI_WARMUP is set)."""
+    for purpose in _model_settings():
+        get_model(purpose)
+
+
+async def warm_up_models() -> None:
+    """
+    Send a tiny request to each distinct model so the first user request
+    doesn't pay for connection setup. Enabled by GEMINI_WARMUP.
+    """
+    warmed = set()
+    for purpose, (name, _) in _model_settings().items():
+        if name in warmed:
+            continue
+        warmed.add(name)
+        try:
+            await asyncio.wait_for(
+                get_model(purpose).generate_content_async("ping"),
+                timeout=settings.GEMINI_TIMEOUT_SECONDS
+            )
+        except Exception as e:
+            print(f"Error warming up Gemini model {name}: {str(e)}")
+
+# Bound concurrent OCR calls so a burst of uploads can't monopolise the worker
+_ocr_semaphore = asyncio.Semaphore(settings.GEMINI_OCR_MAX_CONCURRENCY)
+
+
+async def _generate_ocr_response(model: "genai.GenerativeModel", contents: list) -> str:
+    """Run an OCR generation with the concurrency limit and timeout applied."""
+    async with _ocr_semaphore:
+        response = await asyncio.wait_for(
+            model.generate_content_async(contents),
+            timeout=settings.GEMINI_TIMEOUT_SECONDS
+        )
+    return response.text.strip()
+
+
+# Display region as (left, top, right, bottom) fractions of the image size
+CropBox = Tuple[float, float, float, float]
+
+
+def parse_crop_box(value: str) -> CropBox:
+    """
+    Parse a crop box given as "left,top,right,bottom" fractions (0-1).
+
+    Raises:
+        ValueError: If the value is malformed or describes an empty region
+    """
+    parts = [float(part) for part in value.split(",")]
+    if len(parts) != 4:
+        raise ValueError("Crop box must have 4 values: left,top,right,bottom")
+
+    left, top, right, bottom = parts
+    if not (0 <= left < right <= 1 and 0 <= top < bottom <= 1):
+        raise ValueError("Crop box values must be fractions between 0 and 1 with left < right and top < bottom")
+
+    return left, top, right, bottom
+
+
+def preprocess_image(image_bytes: bytes, crop_box: Optional[CropBox] = None) -> bytes:
+    """
+    Shrink a camera photo before sending it to Gemini.
+
+    Applies the EXIF orientation, optionally crops to the scale display,
+    downsamples so the longest edge is at most OCR_MAX_IMAGE_EDGE and
+    re-encodes as a compact JPEG/WebP.
+
+    Args:
+        image_bytes: Original image bytes
+        crop_box: Optional display region as (left, top, right, bottom) fractions
+
+    Returns:
+        Re-encoded image bytes
+    """
+    from PIL import Image, ImageOps
+
+    image = Image.open(io.BytesIO(image_bytes))
+    max_edge = settings.OCR_MAX_IMAGE_EDGE
+
+    # Let the JPEG decoder downscale while decoding (cropping needs full resolution)
+    if not crop_box:
+        image.draft("RGB", (max_edge, max_edge))
+
+    image = ImageOps.exif_transpose(image)
+
+    if crop_box:
+        width, height = image.size
+        left, top, right, bottom = crop_box
+        image = image.crop((
+            int(left * width),
+            int(top * height),
+            int(right * width),
+            int(bottom * height)
+        ))
+
+    image.thumbnail((max_edge, max_edge), Image.Resampling.LANCZOS)
+
+    if image.mode not in ("RGB", "L"):
+        image = image.convert("RGB")
+
+    output = io.BytesIO()
+    image.save(output, format=settings.OCR_IMAGE_FORMAT, quality=settings.OCR_IMAGE_QUALITY)
+    return output.getvalue()
+
+
+def _parse_json_response(response_text: str) -> dict:
+    """Parse a JSON object from a model response, unwrapping markdown code blocks."""
+    if "```json" in response_text:
+        response_text = response_text.split("```json")[1].split("```")[0].strip()
+    elif "```" in response_text:
+        response_text = response_text.split("```")[1].split("```")[0].strip()
+
+    return json.loads(response_text)
+
+
+async def extract_food_weight_from_image(
+    image_bytes: bytes,
+    crop_box: Optional[CropBox] = None
+) -> Tuple[Optional[float], str, str]:
+    """
+    Extract food weight from kitchen scale image using Gemini Vision.
+
+    Args:
+        image_bytes: Image bytes of kitchen scale
+        crop_box: Optional display region to crop to (see preprocess_image)
+
+    Returns:
+        Tuple of (weight_grams, confidence, message)
+        - weight_grams: Extracted weight in grams or None if extraction failed
+        - confidence: "high", "medium", or "low"
+        - message: Additional information or error message
+    """
+    try:
+        image_bytes = await asyncio.to_thread(preprocess_image, image_bytes, crop_box)
+    except Exception as e:
+        return None, "low", f"Error processing image: {str(e)}"
+
+    return await _read_food_weight(image_bytes)
+
+
+@cached_ocr("food_weight", FOOD_WEIGHT_PROMPT_VERSION)
+async def _read_food_weight(image_bytes: bytes) -> Tuple[Optional[float], str, str]:
+    """
+    Read the food weight from a pre-processed kitchen scale image.
+
+    Args:
+        image_bytes: Pre-processed image bytes of kitchen scale
+
+    Returns:
+        Tuple of (weight_grams, confidence, message)
+        - weight_grams: Extracted weight in grams or None if extraction failed
+        - confidence: "high", "medium", or "low"
+        - message: Additional information or error message
+    """
+    from PIL import Image
+
+    try:
+        # Load image
+        image = Image.open(io.BytesIO(image_bytes))
+
+        response_text = await _generate_ocr_response(get_model("ocr"), [FOOD_WEIGHT_PROMPT, image])
+
+        # Parse JSON response
+        result = _parse_json_response(response_text)
 
         weight = result.get("weight_grams")
         confidence = result.get("confidence", "low")
@@ -79,16 +321,22 @@ def extract_food_weight_from_image(image_bytes: bytes) -> Tuple[Optional[float],
         message = f"Detected {weight}g ({unit})"
         return float(weight), confidence, message
 
+    except asyncio.TimeoutError:
+        return None, "low", "Timed out reading the scale. Please try again."
     except Exception as e:
         return None, "low", f"Error processing image: {str(e)}"
 
 
-def extract_body_weight_from_image(image_bytes: bytes) -> Tuple[Optional[float], str, str]:
+async def extract_body_weight_from_image(
+    image_bytes: bytes,
+    crop_box: Optional[CropBox] = None
+) -> Tuple[Optional[float], str, str]:
     """
     Extract body weight from weighing scale image using Gemini Vision.
 
     Args:
         image_bytes: Image bytes of weighing scale
+        crop_box: Optional display region to crop to (see preprocess_image)
 
     Returns:
         Tuple of (weight_kg, confidence, message)
@@ -97,46 +345,37 @@ def extract_body_weight_from_image(image_bytes: bytes) -> Tuple[Optional[float],
         - message: Additional information or error message
     """
     try:
-        # Load image
-        image = Image.open(io.BytesIO(image_bytes))
+        image_bytes = await asyncio.to_thread(preprocess_image, image_bytes, crop_box)
+    except Exception as e:
+        return None, "low", f"Error processing image: {str(e)}"
 
-        # Use Gemini Vision model
-        model = genai.GenerativeModel('gemini-1.5-flash')
+    return await _read_body_weight(image_bytes)
 
-        prompt = """
-        You are analyzing an image of a body weighing scale.
 
-        Instructions:
-        1. Look for the body weight displayed on the scale
-        2. Extract ONLY the weight number
-        3. Convert to kilograms if shown in pounds or other units (1 lb = 0.453592 kg)
-        4. Return ONLY a JSON object with this exact format:
-        {
-            "weight_kg": <number>,
-            "confidence": "<high|medium|low>",
-            "unit_detected": "<kg|lb|st>"
-        }
+@cached_ocr("body_weight", BODY_WEIGHT_PROMPT_VERSION)
+async def _read_body_weight(image_bytes: bytes) -> Tuple[Optional[float], str, str]:
+    """
+    Read the body weight from a pre-processed weighing scale image.
 
-        If the image is unclear or weight cannot be determined, return:
-        {
-            "weight_kg": null,
-            "confidence": "low",
-            "unit_detected": "unknown"
-        }
-        """
+    Args:
+        image_bytes: Pre-processed image bytes of weighing scale
 
-        response = model.generate_content([prompt, image])
-        response_text = response.text.strip()
+    Returns:
+        Tuple of (weight_kg, confidence, message)
+        - weight_kg: Extracted weight in kg or None if extraction failed
+        - confidence: "high", "medium", or "low"
+        - message: Additional information or error message
+    """
+    from PIL import Image
 
-        # Parse JSON response
-        import json
-        # Extract JSON from markdown code blocks if present
-        if "```json" in response_text:
-            response_text = response_text.split("```json")[1].split("```")[0].strip()
-        elif "```" in response_text:
-            response_text = response_text.split("```")[1].split("```")[0].strip()
+    try:
+        # Load image
+        image = Image.open(io.BytesIO(image_bytes))
 
-        result = json.loads(response_text)
+        response_text = await _generate_ocr_response(get_model("ocr"), [BODY_WEIGHT_PROMPT, image])
+
+        # Parse JSON response
+        result = _parse_json_response(response_text)
 
         weight = result.get("weight_kg")
         confidence = result.get("confidence", "low")
@@ -152,11 +391,107 @@ def extract_body_weight_from_image(image_bytes: bytes) -> Tuple[Optional[float],
         message = f"Detected {weight}kg ({unit})"
         return float(weight), confidence, message
 
+    except asyncio.TimeoutError:
+        return None, "low", "Timed out reading the scale. Please try again."
     except Exception as e:
         return None, "low", f"Error processing image: {str(e)}"
 
 
-def chat_with_gemini(message: str, history: list = None, user_context: dict = None) -> str:
+# Gemini names the assistant's turns "model"
+CHAT_ROLES = {"user": "user", "assistant": "model"}
+
+
+def _start_chat(
+    message: str,
+    history: list = None,
+    user_context: dict = None,
+    summary: str = None
+) -> Tuple["genai.ChatSession", str]:
+    """
+    Set up a coaching chat session and the prompt to send.
+
+    Args:
+        message: User's message
+        history: Chat history (list of dicts with 'role' and 'content')
+        user_context: Additional context (weight logs, food logs, streak, etc.)
+        summary: Summary of earlier messages not included in history
+
+    Returns:
+        Tuple of (chat session, prompt)
+    """
+    # Build context-aware system prompt
+    system_prompt = COACH_SYSTEM_PROMPT
+
+    # Add user context if available
+    if user_context:
+        context_text = "\n\nUser Context:\n"
+        if "streak" in user_context:
+            context_text += f"- Current streak: {user_context['streak']} days\n"
+        if "recent_weight" in user_context:
+            context_text += f"- Recent weight: {user_context['recent_weight']}kg\n"
+        if "weight_trend" in user_context:
+            context_text += f"- Weight trend: {user_context['weight_trend']}\n"
+        if "calories_today" in user_context:
+            context_text += f"- Calories today: {user_context['calories_today']}\n"
+
+        system_prompt += context_text
+
+    if summary:
+        system_prompt += f"\n\nSummary of the earlier conversation:\n{summary}\n"
+
+    # Build conversation history
+    conversation = []
+    if history:
+        for msg in history:
+            conversation.append({
+                "role": CHAT_ROLES.get(msg["role"], "user"),
+                "parts": [msg["content"]]
+            })
+
+    chat = get_model("chat").start_chat(history=conversation)
+    return chat, f"{system_prompt}\n\nUser: {message}"
+
+
+def chat_error_message(error: Exception) -> str:
+    """User-facing reply for a failed chat generation."""
+    if isinstance(error, asyncio.TimeoutError):
+        return "Sorry, the coach took too long to respond. Please try again."
+    return f"Sorry, I encountered an error: {str(error)}. Please try again."
+
+
+async def generate_chat_reply(
+    message: str,
+    history: list = None,
+    user_context: dict = None,
+    summary: str = None
+) -> str:
+    """
+    Generate a coaching reply with Gemini Pro, raising on failure.
+
+    Args:
+        message: User's message
+        history: Chat history (list of dicts with 'role' and 'content')
+        user_context: Additional context (weight logs, food logs, streak, etc.)
+        summary: Summary of earlier messages not included in history
+
+    Returns:
+        AI response string
+
+    Raises:
+        asyncio.TimeoutError: If Gemini doesn't answer within GEMINI_TIMEOUT_SECONDS
+    """
+    chat, prompt = _start_chat(message, history, user_context, summary)
+
+    # Generate response
+    response = await asyncio.wait_for(
+        chat.send_message_async(prompt),
+        timeout=settings.GEMINI_TIMEOUT_SECONDS
+    )
+
+    return response.text.strip()
+
+
+async def chat_with_gemini(message: str, history: list = None, user_context: dict = None) -> str:
     """
     Chat with Gemini Pro for nutrition coaching.
 
@@ -169,54 +504,73 @@ def chat_with_gemini(message: str, history: list = None, user_context: dict = No
         AI response string
     """
     try:
-        model = genai.GenerativeModel('gemini-1.5-pro')
-
-        # Build context-aware system prompt
-        system_prompt = """
-        You are FitWit's AI nutrition coach. You provide personalized guidance on:
-        - Meal planning and suggestions
-        - Calorie tracking insights
-        - Weight trend analysis
-        - Motivation and encouragement
-        - Nutrition education
-
-        Keep responses concise, friendly, and actionable. Use the user's data to give personalized advice.
-        """
+        return await generate_chat_reply(message, history, user_context)
+    except Exception as e:
+        return chat_error_message(e)
 
-        # Add user context if available
-        if user_context:
-            context_text = "\n\nUser Context:\n"
-            if "streak" in user_context:
-                context_text += f"- Current streak: {user_context['streak']} days\n"
-            if "recent_weight" in user_context:
-                context_text += f"- Recent weight: {user_context['recent_weight']}kg\n"
-            if "weight_trend" in user_context:
-                context_text += f"- Weight trend: {user_context['weight_trend']}\n"
-            if "calories_today" in user_context:
-                context_text += f"- Calories today: {user_context['calories_today']}\n"
-
-            system_prompt += context_text
-
-        # Build conversation history
-        conversation = []
-        if history:
-            for msg in history:
-                conversation.append({
-                    "role": msg["role"],
-                    "parts": [msg["content"]]
-                })
-
-        # Add current message
-        conversation.append({
-            "role": "user",
-            "parts": [f"{system_prompt}\n\nUser: {message}"]
-        })
-
-        # Generate response
-        chat = model.start_chat(history=conversation[:-1] if len(conversation) > 1 else [])
-        response = chat.send_message(conversation[-1]["parts"][0])
 
-        return response.text.strip()
+async def summarize_conversation(previous_summary: Optional[str], messages: list) -> Optional[str]:
+    """
+    Fold older chat messages into a conversation's rolling summary.
 
+    Args:
+        previous_summary: Current summary, if any
+        messages: Messages to add (list of dicts with 'role' and 'content'), oldest first
+
+    Returns:
+        Updated summary, or None if summarization failed
+    """
+    transcript = "\n".join(f"{msg['role']}: {msg['content']}" for msg in messages)
+    prompt = SUMMARY_PROMPT.format(summary=previous_summary or "(none)", transcript=transcript)
+
+    try:
+        response = await asyncio.wait_for(
+            get_model("summary").generate_content_async(prompt),
+            timeout=settings.GEMINI_TIMEOUT_SECONDS
+        )
+        return response.text.strip()
     except Exception as e:
-        return f"Sorry, I encountered an error: {str(e)}. Please try again."
+        print(f"Error summarizing conversation: {str(e)}")
+        return None
+
+
+async def stream_chat_with_gemini(
+    message: str,
+    history: list = None,
+    user_context: dict = None,
+    summary: str = None
+) -> AsyncIterator[str]:
+    """
+    Stream a coaching reply from Gemini Pro as text chunks arrive.
+
+    GEMINI_TIMEOUT_SECONDS applies to the first chunk and to each gap
+    between chunks. Closing the generator early (e.g. when the client
+    disconnects) abandons the underlying streaming call.
+
+    Args:
+        message: User's message
+        history: Chat history (list of dicts with 'role' and 'content')
+        user_context: Additional context (weight logs, food logs, streak, etc.)
+        summary: Summary of earlier messages not included in history
+
+    Yields:
+        Response text chunks
+
+    Raises:
+        asyncio.TimeoutError: If Gemini stops sending chunks
+    """
+    chat, prompt = _start_chat(message, history, user_context, summary)
+
+    response = await asyncio.wait_for(
+        chat.send_message_async(prompt, stream=True),
+        timeout=settings.GEMINI_TIMEOUT_SECONDS
+    )
+
+    chunks = response.__aiter__()
+    while True:
+        try:
+            chunk = await asyncio.wait_for(chunks.__anext__(), timeout=settings.GEMINI_TIMEOUT_SECONDS)
+        except StopAsyncIteration:
+            break
+        if chunk.text:
+            yield chunk.text
@@ -0,0 +1,182 @@
+import functools
+import hashlib
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Awaitable, Callable, Optional, Tuple
+from sqlalchemy import delete, select
+from app.config import settings
+from app.core.cache import TTLCache
+from app.database import AsyncSessionLocal, get_dialect_insert
+from app.models.ocr_cache import OCRCacheEntry
+
+# (weight, confidence, message), as returned by the Gemini OCR functions
+OCRResult = Tuple[Optional[float], str, str]
+
+
+class OCRCacheBackend:
+    """Storage for OCR results keyed on image content."""
+
+    name = "none"
+
+    async def get(self, key: str) -> Optional[OCRResult]:
+        return None
+
+    async def set(self, key: str, result: OCRResult) -> None:
+        return None
+
+
+class MemoryOCRCache(OCRCacheBackend):
+    """Per-worker LRU cache with TTL."""
+
+    name = "memory"
+
+    def __init__(self, maxsize: int, ttl: float):
+        self._cache = TTLCache(maxsize=maxsize, ttl=ttl)
+
+    async def get(self, key: str) -> Optional[OCRResult]:
+        return self._cache.get(key)
+
+    async def set(self, key: str, result: OCRResult) -> None:
+        self._cache.set(key, result)
+
+
+class DatabaseOCRCache(OCRCacheBackend):
+    """Cache stored in the ocr_cache table, shared by all workers."""
+
+    name = "database"
+
+    def __init__(self, ttl: float, purge_interval: float):
+        self.ttl = ttl
+        self.purge_interval = purge_interval
+        self._last_purge: Optional[float] = None
+
+    def _cutoff(self) -> datetime:
+        return datetime.now(timezone.utc) - timedelta(seconds=self.ttl)
+
+    async def get(self, key: str) -> Optional[OCRResult]:
+        cutoff = self._cutoff()
+
+        async with AsyncSessionLocal() as db:
+            result = await db.execute(
+                select(OCRCacheEntry).where(
+                    OCRCacheEntry.key == key,
+                    OCRCacheEntry.created_at >= cutoff
+                )
+            )
+            entry = result.scalars().first()
+
+        if entry is None:
+            return None
+        return entry.weight, entry.confidence, entry.message
+
+    async def set(self, key: str, result: OCRResult) -> None:
+        weight, confidence, message = result
+        values = {
+            "weight": weight,
+            "confidence": confidence,
+            "message": message,
+            "created_at": datetime.now(timezone.utc),
+        }
+
+        async with AsyncSessionLocal() as db:
+            insert = get_dialect_insert(db)
+            stmt = insert(OCRCacheEntry).values(key=key, **values)
+            stmt = stmt.on_conflict_do_update(index_elements=[OCRCacheEntry.key], set_=values)
+            await db.execute(stmt)
+            await db.commit()
+
+        now = time.monotonic()
+        if self._last_purge is None or now - self._last_purge >= self.purge_interval:
+            self._last_purge = now
+            await self.purge_expired()
+
+    async def purge_expired(self) -> int:
+        """
+        Delete rows older than the TTL.
+
+        Returns:
+            Number of rows deleted
+        """
+        async with AsyncSessionLocal() as db:
+            result = await db.execute(
+                delete(OCRCacheEntry).where(OCRCacheEntry.created_at < self._cutoff())
+            )
+            await db.commit()
+        return result.rowcount
+
+
+def _create_backend() -> OCRCacheBackend:
+    """Create the backend selected by OCR_CACHE_BACKEND."""
+    backend = settings.OCR_CACHE_BACKEND
+    if backend == "memory":
+        return MemoryOCRCache(maxsize=settings.OCR_CACHE_MAX_ENTRIES, ttl=settings.OCR_CACHE_TTL_SECONDS)
+    if backend == "database":
+        return DatabaseOCRCache(
+            ttl=settings.OCR_CACHE_TTL_SECONDS,
+            purge_interval=settings.OCR_CACHE_PURGE_INTERVAL_SECONDS
+        )
+    if backend == "none":
+        return OCRCacheBackend()
+    raise ValueError(f"Unknown OCR_CACHE_BACKEND '{backend}'")
+
+
+ocr_cache = _create_backend()
+
+# Hit/miss/error counters for monitoring (per worker)
+_stats = {"hits": 0, "misses": 0, "errors": 0}
+
+
+def get_ocr_cache_stats() -> dict:
+    """Get OCR cache hit/miss/error counters for this worker."""
+    return {"backend": ocr_cache.name, **_stats}
+
+
+def make_cache_key(kind: str, prompt_version: str, image_bytes: bytes) -> str:
+    """Build a cache key from the OCR kind, prompt version and image content."""
+    digest = hashlib.sha256(image_bytes).hexdigest()
+    return f"{kind}:{prompt_version}:{digest}"
+
+
+def cached_ocr(kind: str, prompt_version: str):
+    """
+    Cache successful results of an OCR function keyed on the image bytes.
+
+    Failed readings are not cached, so a retry still reaches Gemini. The
+    cache fails open: if it can't be read or written (e.g. the database is
+    unavailable), the error is logged and counted and Gemini is called as
+    if there were no cache.
+
+    Args:
+        kind: Name of the OCR task (e.g. "food_weight")
+        prompt_version: Version of the prompt; bump it to invalidate old results
+    """
+    def decorator(func: Callable[[bytes], Awaitable[OCRResult]]):
+        @functools.wraps(func)
+        async def wrapper(image_bytes: bytes) -> OCRResult:
+            key = make_cache_key(kind, prompt_version, image_bytes)
+
+            try:
+                cached = await ocr_cache.get(key)
+            except Exception as e:
+                print(f"Error reading OCR cache: {str(e)}")
+                _stats["errors"] += 1
+                cached = None
+
+            if cached is not None:
+                _stats["hits"] += 1
+                return cached
+
+            _stats["misses"] += 1
+            result = await func(image_bytes)
+            if result[0] is not None:
+                try:
+                    await ocr_cache.set(key, result)
+                except Exception as e:
+                    print(f"Error writing OCR cache: {str(e)}")
+                    _stats["errors"] += 1
+
+            return result
+
+        return wrapper
+
+    return decorator
@@ -1,7 +1,153 @@
-import requests
+import asyncio
+import time
+import httpx
 from typing import Optional, Dict
 from app.config import settings
 
+# HTTP status codes worth retrying (rate limiting and transient server errors)
+RETRY_STATUS_CODES = {429, 500, 502, 503, 504}
+
+# Shared clients, created on first use so connections are pooled and kept alive
+_client: Optional[httpx.Client] = None
+_async_client: Optional[httpx.AsyncClient] = None
+
+
+def _client_options() -> dict:
+    """Get the options shared by the sync and async clients."""
+    return {
+        "timeout": httpx.Timeout(settings.OPENFOODFACTS_TIMEOUT_SECONDS),
+        "limits": httpx.Limits(
+            max_connections=settings.OPENFOODFACTS_MAX_CONNECTIONS,
+            max_keepalive_connections=settings.OPENFOODFACTS_MAX_CONNECTIONS
+        ),
+        "headers": {"User-Agent": settings.OPENFOODFACTS_USER_AGENT},
+    }
+
+
+def get_client() -> httpx.Client:
+    """Get the shared sync OpenFoodFacts client."""
+    global _client
+    if _client is None:
+        _client = httpx.Client(
+            transport=httpx.HTTPTransport(retries=settings.OPENFOODFACTS_MAX_RETRIES),
+            **_client_options()
+        )
+    return _client
+
+
+def get_async_client() -> httpx.AsyncClient:
+    """Get the shared async OpenFoodFacts client."""
+    global _async_client
+    if _async_client is None:
+        _async_client = httpx.AsyncClient(
+            transport=httpx.AsyncHTTPTransport(retries=settings.OPENFOODFACTS_MAX_RETRIES),
+            **_client_options()
+        )
+    return _async_client
+
+
+async def close_clients() -> None:
+    """Close the shared clients (called on app shutdown)."""
+    global _client, _async_client
+    if _client is not None:
+        _client.close()
+        _client = None
+    if _async_client is not None:
+        await _async_client.aclose()
+        _async_client = None
+
+
+def _backoff_delay(attempt: int) -> float:
+    """Exponential backoff delay before the given retry attempt."""
+    return settings.OPENFOODFACTS_BACKOFF_SECONDS * (2 ** attempt)
+
+
+def _get(url: str, params: Optional[dict] = None) -> httpx.Response:
+    """GET with retries on rate limiting and transient server errors."""
+    client = get_client()
+    for attempt in range(settings.OPENFOODFACTS_MAX_RETRIES):
+        response = client.get(url, params=params)
+        if response.status_code not in RETRY_STATUS_CODES:
+            return response
+        time.sleep(_backoff_delay(attempt))
+    return client.get(url, params=params)
+
+
+async def _get_async(url: str, params: Optional[dict] = None) -> httpx.Response:
+    """Async GET with retries on rate limiting and transient server errors."""
+    client = get_async_client()
+    for attempt in range(settings.OPENFOODFACTS_MAX_RETRIES):
+        response = await client.get(url, params=params)
+        if response.status_code not in RETRY_STATUS_CODES:
+            return response
+        await asyncio.sleep(_backoff_delay(attempt))
+    return await client.get(url, params=params)
+
+
+def _number(value) -> float:
+    """Coerce a nutriment value (number, numeric string or missing) to float."""
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return 0.0
+
+
+def parse_product(product: Dict, barcode: Optional[str] = None) -> Dict:
+    """
+    Map an OpenFoodFacts product to FoodItem fields.
+
+    Args:
+        product: Product object from the OpenFoodFacts API
+        barcode: Barcode to use instead of the product's own code
+
+    Returns:
+        Dictionary with food information (nutrition per 100g)
+    """
+    nutriments = product.get("nutriments", {})
+
+    return {
+        "source": "openfoodfacts",
+        "name": product.get("product_name", "Unknown Product"),
+        "barcode": barcode or product.get("code"),
+        "calories_per_100g": _number(nutriments.get("energy-kcal_100g")),
+        "protein": _number(nutriments.get("proteins_100g")),
+        "carbs": _number(nutriments.get("carbohydrates_100g")),
+        "fat": _number(nutriments.get("fat_100g")),
+    }
+
+
+def _product_url(barcode: str) -> str:
+    return f"{settings.OPENFOODFACTS_API_URL.rstrip('/')}/product/{barcode}.json"
+
+
+def _search_params(query: str, limit: int) -> dict:
+    return {
+        "search_terms": query,
+        "page_size": limit,
+        "json": 1,
+        "action": "process"
+    }
+
+
+def _parse_barcode_response(response: httpx.Response, barcode: str) -> Optional[Dict]:
+    if response.status_code != 200:
+        return None
+
+    data = response.json()
+
+    if data.get("status") != 1:
+        return None
+
+    return parse_product(data.get("product", {}), barcode=barcode)
+
+
+def _parse_search_response(response: httpx.Response) -> list:
+    if response.status_code != 200:
+        return []
+
+    products = response.json().get("products", [])
+    return [parse_product(product) for product in products]
+
 
 def search_food_by_barcode(barcode: str) -> Optional[Dict]:
     """
@@ -14,30 +160,41 @@ def search_food_by_barcode(barcode: str) -> Optional[Dict]:
         Dictionary with food information or None if not found
     """
     try:
-        url = f"https://world.openfoodfacts.org/api/v2/product/{barcode}.json"
-        response = requests.get(url, timeout=10)
+        return _parse_barcode_response(_get(_product_url(barcode)), barcode)
+
+    except Exception as e:
+        print(f"Error fetching barcode {barcode}: {str(e)}")
+        return None
+
 
-        if response.status_code != 200:
-            return None
+async def fetch_food_by_barcode_async(barcode: str) -> Optional[Dict]:
+    """
+    Fetch a food item by barcode, raising on network or server errors.
+
+    Unlike search_food_by_barcode_async, None always means OpenFoodFacts
+    doesn't know the product, so callers can safely cache the miss.
+
+    Args:
+        barcode: Product barcode
 
-        data = response.json()
+    Returns:
+        Dictionary with food information or None if not found
 
-        if data.get("status") != 1:
-            return None
+    Raises:
+        httpx.HTTPError: If the request fails or the server returns an error
+    """
+    response = await _get_async(_product_url(barcode))
+    if response.status_code == 404:
+        return None
+    response.raise_for_status()
 
-        product = data.get("product", {})
+    return _parse_barcode_response(response, barcode)
 
-        # Extract nutritional information per 100g
-        nutriments = product.get("nutriments", {})
 
-        return {
-            "name": product.get("product_name", "Unknown Product"),
-            "barcode": barcode,
-            "calories_per_100g": nutriments.get("energy-kcal_100g", 0),
-            "protein": nutriments.get("proteins_100g", 0),
-            "carbs": nutriments.get("carbohydrates_100g", 0),
-            "fat": nutriments.get("fat_100g", 0),
-        }
+async def search_food_by_barcode_async(barcode: str) -> Optional[Dict]:
+    """Async version of search_food_by_barcode."""
+    try:
+        return await fetch_food_by_barcode_async(barcode)
 
     except Exception as e:
         print(f"Error fetching barcode {barcode}: {str(e)}")
@@ -56,36 +213,42 @@ def search_food_by_name(query: str, limit: int = 10) -> list:
         List of food items
     """
     try:
-        url = f"https://world.openfoodfacts.org/cgi/search.pl"
-        params = {
-            "search_terms": query,
-            "page_size": limit,
-            "json": 1,
-            "action": "process"
-        }
-
-        response = requests.get(url, params=params, timeout=10)
-
-        if response.status_code != 200:
-            return []
-
-        data = response.json()
-        products = data.get("products", [])
-
-        results = []
-        for product in products:
-            nutriments = product.get("nutriments", {})
-
-            results.append({
-                "name": product.get("product_name", "Unknown Product"),
-                "barcode": product.get("code"),
-                "calories_per_100g": nutriments.get("energy-kcal_100g", 0),
-                "protein": nutriments.get("proteins_100g", 0),
-                "carbs": nutriments.get("carbohydrates_100g", 0),
-                "fat": nutriments.get("fat_100g", 0),
-            })
-
-        return results
+        return _parse_search_response(
+            _get(settings.OPENFOODFACTS_SEARCH_URL, params=_search_params(query, limit))
+        )
+
+    except Exception as e:
+        print(f"Error searching for {query}: {str(e)}")
+        return []
+
+
+async def fetch_food_by_name_async(query: str, limit: int = 10) -> list:
+    """
+    Search OpenFoodFacts by name, raising on network or server errors.
+
+    Unlike search_food_by_name_async, an empty list always means no
+    products matched.
+
+    Args:
+        query: Search query
+        limit: Maximum number of results
+
+    Returns:
+        List of food items
+
+    Raises:
+        httpx.HTTPError: If the request fails or the server returns an error
+    """
+    response = await _get_async(settings.OPENFOODFACTS_SEARCH_URL, params=_search_params(query, limit))
+    response.raise_for_status()
+
+    return _parse_search_response(response)
+
+
+async def search_food_by_name_async(query: str, limit: int = 10) -> list:
+    """Async version of search_food_by_name."""
+    try:
+        return await fetch_food_by_name_async(query, limit)
 
     except Exception as e:
         print(f"Error searching for {query}: {str(e)}")
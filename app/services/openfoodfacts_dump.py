@@ -0,0 +1,180 @@
+import csv
+import gzip
+import io
+import json
+import sys
+import time
+from pathlib import Path
+from typing import Dict, Iterator, Optional, Tuple
+from app.database import AsyncSessionLocal
+from app.core.food_store import upsert_food_items
+from app.services.openfoodfacts import parse_product
+
+# Nutriment columns in the OpenFoodFacts CSV export
+CSV_NUTRIMENT_COLUMNS = ("energy-kcal_100g", "proteins_100g", "carbohydrates_100g", "fat_100g")
+
+
+def _open_text(path: Path) -> io.TextIOBase:
+    """Open a dump file as text, transparently decompressing gzip."""
+    with open(path, "rb") as f:
+        is_gzip = f.read(2) == b"\x1f\x8b"
+
+    if is_gzip:
+        return io.TextIOWrapper(gzip.open(path, "rb"), encoding="utf-8", errors="replace", newline="")
+    return open(path, "r", encoding="utf-8", errors="replace", newline="")
+
+
+def detect_format(path: Path) -> str:
+    """Guess the dump format ("jsonl" or "csv") from the file name."""
+    suffixes = [suffix.lower() for suffix in path.suffixes if suffix.lower() != ".gz"]
+    if suffixes and suffixes[-1] in (".csv", ".tsv"):
+        return "csv"
+    return "jsonl"
+
+
+def _iter_jsonl(f: io.TextIOBase) -> Iterator[Optional[Dict]]:
+    for line in f:
+        line = line.strip()
+        if not line:
+            yield None
+            continue
+        try:
+            yield json.loads(line)
+        except json.JSONDecodeError:
+            yield None
+
+
+def _iter_csv(f: io.TextIOBase, delimiter: str) -> Iterator[Optional[Dict]]:
+    # Some OpenFoodFacts fields (ingredients, categories) exceed the default limit
+    csv.field_size_limit(sys.maxsize)
+
+    # The official tab-separated export doesn't quote fields, and stray quotes
+    # inside product names would otherwise swallow following rows
+    quoting = csv.QUOTE_NONE if delimiter == "\t" else csv.QUOTE_MINIMAL
+
+    for row in csv.DictReader(f, delimiter=delimiter, quoting=quoting):
+        # Reshape to the API's product layout so parse_product maps it the same way
+        yield {
+            "code": row.get("code"),
+            "product_name": row.get("product_name") or None,
+            "nutriments": {column: row.get(column) for column in CSV_NUTRIMENT_COLUMNS},
+        }
+
+
+def iter_products(path: Path, file_format: str, delimiter: str = "\t") -> Iterator[Optional[Dict]]:
+    """
+    Stream products from a dump file, one per record.
+
+    Unparseable records yield None so record numbers stay stable for
+    resume checkpoints.
+
+    Args:
+        path: JSONL or CSV dump file, optionally gzip-compressed
+        file_format: "jsonl" or "csv"
+        delimiter: CSV field delimiter (the official export is tab-separated)
+    """
+    with _open_text(path) as f:
+        if file_format == "csv":
+            yield from _iter_csv(f, delimiter)
+        else:
+            yield from _iter_jsonl(f)
+
+
+def _to_food_item(product: Optional[Dict]) -> Optional[Dict]:
+    """Map a dump product to FoodItem fields, or None if it can't be used."""
+    if not product or not product.get("code"):
+        return None
+
+    item = parse_product(product)
+    if not item["name"]:
+        item["name"] = "Unknown Product"
+    return item
+
+
+def _read_checkpoint(path: Path) -> Tuple[int, int]:
+    if not path.exists():
+        return 0, 0
+    data = json.loads(path.read_text())
+    return data["records"], data["imported"]
+
+
+def _write_checkpoint(path: Path, records: int, imported: int) -> None:
+    tmp_path = path.with_suffix(path.suffix + ".tmp")
+    tmp_path.write_text(json.dumps({"records": records, "imported": imported}))
+    tmp_path.replace(path)
+
+
+async def import_dump(
+    path: Path,
+    file_format: Optional[str] = None,
+    batch_size: int = 5000,
+    resume: bool = False,
+    delimiter: str = "\t",
+    limit: Optional[int] = None
+) -> Dict:
+    """
+    Import an OpenFoodFacts dump into food_items in constant memory.
+
+    Products are upserted by barcode in batches, each committed together
+    with a checkpoint file next to the dump (<dump>.checkpoint) so an
+    interrupted import can continue with resume=True.
+
+    Args:
+        path: JSONL or CSV dump file, optionally gzip-compressed
+        file_format: "jsonl" or "csv" (default: guessed from the file name)
+        batch_size: Products per INSERT batch
+        resume: Skip records already imported according to the checkpoint
+        delimiter: CSV field delimiter
+        limit: Stop after this many records (for trial runs)
+
+    Returns:
+        dict with records read, products imported, elapsed seconds and rows/sec
+    """
+    file_format = file_format or detect_format(path)
+    checkpoint_path = path.with_name(path.name + ".checkpoint")
+
+    skip, imported = _read_checkpoint(checkpoint_path) if resume else (0, 0)
+    records = 0
+    batch = []
+    start = time.perf_counter()
+    imported_this_run = 0
+
+    async with AsyncSessionLocal() as db:
+        async def flush() -> None:
+            nonlocal imported, imported_this_run
+            count = await upsert_food_items(db, batch)
+            await db.commit()
+            imported += count
+            imported_this_run += count
+            batch.clear()
+            _write_checkpoint(checkpoint_path, records, imported)
+
+            elapsed = time.perf_counter() - start
+            print(
+                f"{records:,} records, {imported:,} products imported "
+                f"({imported_this_run / elapsed:,.0f} rows/sec)"
+            )
+
+        for product in iter_products(path, file_format, delimiter):
+            records += 1
+            if records <= skip:
+                continue
+            if limit is not None and records > skip + limit:
+                records -= 1
+                break
+
+            item = _to_food_item(product)
+            if item:
+                batch.append(item)
+            if len(batch) >= batch_size:
+                await flush()
+
+        await flush()
+
+    elapsed = time.perf_counter() - start
+    return {
+        "records": records,
+        "imported": imported,
+        "elapsed_seconds": round(elapsed, 2),
+        "rows_per_second": round(imported_this_run / elapsed, 1) if elapsed else 0.0,
+    }
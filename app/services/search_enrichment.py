@@ -0,0 +1,163 @@
+import json
+import time
+from datetime import datetime, timedelta, timezone
+from typing import List, Optional
+from sqlalchemy import and_, delete, or_, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.config import settings
+from app.core.food_store import get_or_create_food_items
+from app.database import AsyncSessionLocal, get_dialect_insert
+from app.models.food import FoodItem
+from app.models.food_search import FoodSearchEnrichment
+from app.services.openfoodfacts import fetch_food_by_name_async
+
+# Enrichment state lives in the food_search_enrichments table so a poll
+# answered by any worker sees the same fetch. A row is current while its
+# fetch is running (for up to FOOD_SEARCH_ENRICH_PENDING_SECONDS) or for
+# FOOD_SEARCH_ENRICH_TTL_SECONDS after it finished.
+
+_last_purge: Optional[float] = None
+
+
+def normalize_query(query: str) -> str:
+    """Normalize a search query so equivalent searches share one remote fetch."""
+    return " ".join(query.lower().split())
+
+
+def _cutoffs(now: datetime):
+    """Oldest fetched_at and (for pending fetches) started_at that are still current."""
+    return (
+        now - timedelta(seconds=settings.FOOD_SEARCH_ENRICH_TTL_SECONDS),
+        now - timedelta(seconds=settings.FOOD_SEARCH_ENRICH_PENDING_SECONDS),
+    )
+
+
+def _is_current(now: datetime):
+    """SQL condition for an enrichment row that is still pending or fresh."""
+    fetched_cutoff, pending_cutoff = _cutoffs(now)
+    return or_(
+        FoodSearchEnrichment.fetched_at >= fetched_cutoff,
+        and_(FoodSearchEnrichment.fetched_at.is_(None), FoodSearchEnrichment.started_at >= pending_cutoff)
+    )
+
+
+def _is_expired(now: datetime):
+    """SQL condition for an enrichment row that is no longer current (written out so NULLs compare)."""
+    fetched_cutoff, pending_cutoff = _cutoffs(now)
+    return or_(
+        FoodSearchEnrichment.fetched_at < fetched_cutoff,
+        and_(FoodSearchEnrichment.fetched_at.is_(None), FoodSearchEnrichment.started_at < pending_cutoff)
+    )
+
+
+async def get_enrichment(db: AsyncSession, query: str) -> Optional[FoodSearchEnrichment]:
+    """
+    Get the current enrichment of a search.
+
+    Returns:
+        The enrichment if a fetch is pending (fetched_at is None) or
+        finished within the TTL, else None
+    """
+    result = await db.execute(
+        select(FoodSearchEnrichment).where(
+            FoodSearchEnrichment.query == normalize_query(query),
+            _is_current(datetime.now(timezone.utc))
+        )
+    )
+    return result.scalars().first()
+
+
+async def get_enriched_items(db: AsyncSession, enrichment: FoodSearchEnrichment) -> List[FoodItem]:
+    """Load the food items a finished enrichment fetched, in OpenFoodFacts order."""
+    food_ids = json.loads(enrichment.food_ids or "[]")
+    if not food_ids:
+        return []
+
+    result = await db.execute(select(FoodItem).where(FoodItem.id.in_(food_ids)))
+    food_items = {food_item.id: food_item for food_item in result.scalars().all()}
+    return [food_items[food_id] for food_id in food_ids if food_id in food_items]
+
+
+async def schedule_enrichment(db: AsyncSession, query: str) -> bool:
+    """
+    Mark a search as pending, unless a current enrichment already exists.
+
+    The claim is a single upsert, so only one request across all workers
+    wins it. The caller must commit before starting the fetch.
+
+    Returns:
+        True if the caller should run enrich_search for this query
+    """
+    now = datetime.now(timezone.utc)
+    values = {"food_ids": None, "started_at": now, "fetched_at": None}
+
+    insert = get_dialect_insert(db)
+    stmt = insert(FoodSearchEnrichment).values(query=normalize_query(query), **values)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[FoodSearchEnrichment.query],
+        set_=values,
+        where=_is_expired(now)
+    )
+    result = await db.execute(stmt)
+    return result.rowcount > 0
+
+
+async def purge_expired_enrichments() -> int:
+    """
+    Delete enrichments that are no longer current.
+
+    Returns:
+        Number of rows deleted
+    """
+    async with AsyncSessionLocal() as db:
+        result = await db.execute(
+            delete(FoodSearchEnrichment).where(_is_expired(datetime.now(timezone.utc)))
+        )
+        await db.commit()
+    return result.rowcount
+
+
+async def enrich_search(query: str, limit: int = 10) -> None:
+    """
+    Fetch a search from OpenFoodFacts and store new items (run as a background task).
+
+    The fetched item IDs are recorded so the next poll returns them, even
+    those the local search doesn't match. Failed fetches are forgotten, so
+    the next search tries again.
+
+    Args:
+        query: Search query
+        limit: Maximum number of remote results
+    """
+    global _last_purge
+    key = normalize_query(query)
+
+    try:
+        off_results = await fetch_food_by_name_async(query, limit=limit)
+
+        async with AsyncSessionLocal() as db:
+            food_items = await get_or_create_food_items(db, off_results)
+            await db.execute(
+                update(FoodSearchEnrichment).where(FoodSearchEnrichment.query == key).values(
+                    food_ids=json.dumps([food_item.id for food_item in food_items]),
+                    fetched_at=datetime.now(timezone.utc)
+                )
+            )
+            await db.commit()
+    except Exception as e:
+        print(f"Error enriching search {query}: {str(e)}")
+        try:
+            async with AsyncSessionLocal() as db:
+                await db.execute(delete(FoodSearchEnrichment).where(FoodSearchEnrichment.query == key))
+                await db.commit()
+        except Exception as e:
+            print(f"Error clearing search enrichment {query}: {str(e)}")
+        return
+
+    now = time.monotonic()
+    if _last_purge is None or now - _last_purge >= settings.FOOD_SEARCH_ENRICH_PURGE_INTERVAL_SECONDS:
+        _last_purge = now
+        try:
+            await purge_expired_enrichments()
+        except Exception as e:
+            print(f"Error purging search enrichments: {str(e)}")